@@ -0,0 +1,261 @@
+"""
+Priority-aware admission control for the AI service.
+
+Requests are sorted into traffic classes by path: interactive dashboard
+calls (``/analyze``) and bulk work from the Node backend
+(``/job-recommendations``, ``/process-document``...). Only
+``ADMISSION_MAX_CONCURRENCY`` requests run at once; the rest wait in one
+queue per class.
+
+When a slot frees up, the next class is chosen by stride scheduling: each
+class advances a virtual clock by ``1 / weight`` per admitted request, so an
+interactive weight of 8 against bulk 1 admits eight interactive requests for
+each bulk one while both are waiting. Within a class, requests from a client
+(``X-Client-Id`` header, else the peer address) that already has
+``client_quota`` requests running are skipped.
+
+The ``X-Traffic-Class`` and ``X-Client-Id`` headers are a trust boundary:
+any caller could use them to jump the bulk queue or dodge its client quota,
+so they are only honoured from peer addresses listed in
+``ADMISSION_TRUSTED_CLIENTS`` (comma-separated, e.g. the Node backend). For
+everyone else the class comes from the path and the client is the peer.
+
+A request that cannot be admitted within its class's queue deadline, or that
+finds the queue full, is shed with ``429`` and a ``Retry-After`` estimate.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from metrics import Counter, Gauge
+
+QUEUE_DEPTH = Gauge("admission_queue_depth", "Requests waiting for admission", ("traffic_class",))
+IN_FLIGHT = Gauge("admission_in_flight", "Requests currently admitted", ("traffic_class",))
+ADMITTED = Counter("admission_admitted_total", "Requests admitted", ("traffic_class",))
+SHED = Counter("admission_shed_total", "Requests rejected with 429", ("traffic_class", "reason"))
+QUEUE_WAIT = Counter("admission_queue_wait_seconds_total", "Time admitted requests spent queued", ("traffic_class",))
+
+
+class TrafficClass:
+    """Scheduling parameters and queue of one traffic class"""
+
+    def __init__(self, name: str, weight: float, paths: List[str], queue_timeout: float,
+                 max_queue: int, client_quota: int):
+        self.name = name
+        self.weight = weight
+        self.paths = paths
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.client_quota = client_quota
+        self.queue: Deque["_Waiter"] = deque()
+        self.running = 0
+        self.pass_value = 0.0
+        self.service_time = 0.5  # EWMA of handler time, seconds
+
+    def matches(self, path: str) -> bool:
+        return any(path == p or path.startswith(p + "/") for p in self.paths)
+
+
+class _Waiter:
+    def __init__(self, client: str, future: "asyncio.Future[bool]"):
+        self.client = client
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+def default_classes() -> List[TrafficClass]:
+    env = os.environ.get
+    return [
+        TrafficClass(
+            "interactive",
+            weight=float(env("ADMISSION_INTERACTIVE_WEIGHT", "8")),
+            paths=["/analyze", "/rank-resumes"],
+            queue_timeout=float(env("ADMISSION_INTERACTIVE_TIMEOUT", "5")),
+            max_queue=int(env("ADMISSION_INTERACTIVE_MAX_QUEUE", "100")),
+            client_quota=int(env("ADMISSION_INTERACTIVE_CLIENT_QUOTA", "4")),
+        ),
+        TrafficClass(
+            "bulk",
+            weight=float(env("ADMISSION_BULK_WEIGHT", "1")),
+            paths=["/job-recommendations", "/process-document", "/scrape-job"],
+            queue_timeout=float(env("ADMISSION_BULK_TIMEOUT", "30")),
+            max_queue=int(env("ADMISSION_BULK_MAX_QUEUE", "500")),
+            client_quota=int(env("ADMISSION_BULK_CLIENT_QUOTA", "2")),
+        ),
+    ]
+
+
+class AdmissionController:
+    """Slot accounting and weighted scheduling across traffic classes"""
+
+    def __init__(self, classes: List[TrafficClass], max_concurrency: int):
+        self.classes = {c.name: c for c in classes}
+        self.max_concurrency = max_concurrency
+        self.running = 0
+        self._virtual_time = 0.0
+        self._client_running: Dict[str, int] = {}
+
+    def classify(self, path: str, requested: Optional[str]) -> Optional[TrafficClass]:
+        if requested and requested in self.classes:
+            return self.classes[requested]
+        for traffic_class in self.classes.values():
+            if traffic_class.matches(path):
+                return traffic_class
+        return None
+
+    def _client_key(self, traffic_class: TrafficClass, client: str) -> str:
+        return f"{traffic_class.name}:{client}"
+
+    def _eligible(self, traffic_class: TrafficClass) -> Optional[_Waiter]:
+        for waiter in traffic_class.queue:
+            key = self._client_key(traffic_class, waiter.client)
+            if self._client_running.get(key, 0) < traffic_class.client_quota:
+                return waiter
+        return None
+
+    def _grant(self, traffic_class: TrafficClass, client: str) -> None:
+        self.running += 1
+        traffic_class.running += 1
+        key = self._client_key(traffic_class, client)
+        self._client_running[key] = self._client_running.get(key, 0) + 1
+        IN_FLIGHT.set(traffic_class.running, traffic_class=traffic_class.name)
+        ADMITTED.inc(traffic_class=traffic_class.name)
+
+    def dispatch(self) -> None:
+        """Hand free slots to waiting requests, lowest virtual time first"""
+        while self.running < self.max_concurrency:
+            candidates = []
+            for traffic_class in self.classes.values():
+                waiter = self._eligible(traffic_class)
+                if waiter is not None:
+                    candidates.append((traffic_class.pass_value, traffic_class.name, traffic_class, waiter))
+            if not candidates:
+                return
+            _, _, traffic_class, waiter = min(candidates, key=lambda c: (c[0], c[1]))
+            self._virtual_time = traffic_class.pass_value
+            traffic_class.pass_value += 1.0 / traffic_class.weight
+            traffic_class.queue.remove(waiter)
+            QUEUE_DEPTH.set(len(traffic_class.queue), traffic_class=traffic_class.name)
+            self._grant(traffic_class, waiter.client)
+            waiter.future.set_result(True)
+
+    async def acquire(self, traffic_class: TrafficClass, client: str) -> Optional[float]:
+        """Wait for a slot. Returns None when admitted, or a Retry-After value when shed"""
+        if len(traffic_class.queue) >= traffic_class.max_queue:
+            SHED.inc(traffic_class=traffic_class.name, reason="queue_full")
+            return self.retry_after(traffic_class)
+
+        if not traffic_class.queue and not traffic_class.running:
+            # A class that was idle must not bank credit from its idle time
+            traffic_class.pass_value = max(traffic_class.pass_value, self._virtual_time)
+        waiter = _Waiter(client, asyncio.get_running_loop().create_future())
+        traffic_class.queue.append(waiter)
+        QUEUE_DEPTH.set(len(traffic_class.queue), traffic_class=traffic_class.name)
+        self.dispatch()
+
+        try:
+            if not waiter.future.done():
+                await asyncio.wait({waiter.future}, timeout=traffic_class.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away while queued: give back a slot granted meanwhile
+            if waiter.future.done():
+                self.release(traffic_class, client, traffic_class.service_time)
+            else:
+                traffic_class.queue.remove(waiter)
+                QUEUE_DEPTH.set(len(traffic_class.queue), traffic_class=traffic_class.name)
+            raise
+        if not waiter.future.done():
+            traffic_class.queue.remove(waiter)
+            waiter.future.cancel()
+            QUEUE_DEPTH.set(len(traffic_class.queue), traffic_class=traffic_class.name)
+            SHED.inc(traffic_class=traffic_class.name, reason="deadline")
+            return self.retry_after(traffic_class)
+
+        QUEUE_WAIT.inc(time.perf_counter() - waiter.enqueued, traffic_class=traffic_class.name)
+        return None
+
+    def release(self, traffic_class: TrafficClass, client: str, service_time: float) -> None:
+        self.running -= 1
+        traffic_class.running -= 1
+        key = self._client_key(traffic_class, client)
+        self._client_running[key] -= 1
+        if not self._client_running[key]:
+            del self._client_running[key]
+        traffic_class.service_time = 0.8 * traffic_class.service_time + 0.2 * service_time
+        IN_FLIGHT.set(traffic_class.running, traffic_class=traffic_class.name)
+        self.dispatch()
+
+    def retry_after(self, traffic_class: TrafficClass) -> float:
+        """Rough time until the class's current backlog has drained"""
+        backlog = len(traffic_class.queue) + 1
+        return max(1.0, backlog * traffic_class.service_time / max(1, self.max_concurrency))
+
+
+def trusted_clients() -> Set[str]:
+    value = os.environ.get("ADMISSION_TRUSTED_CLIENTS", "")
+    return {address.strip() for address in value.split(",") if address.strip()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that queues, schedules and sheds requests by traffic class"""
+
+    def __init__(self, app: Any, controller: Optional[AdmissionController] = None,
+                 trusted: Optional[Set[str]] = None):
+        self.app = app
+        self.controller = controller or AdmissionController(
+            default_classes(), int(os.environ.get("ADMISSION_MAX_CONCURRENCY", "4"))
+        )
+        self.trusted = trusted_clients() if trusted is None else trusted
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        peer = scope.get("client")
+        address = peer[0] if peer else "unknown"
+        requested = client = None
+        if address in self.trusted:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-traffic-class":
+                    requested = value.decode("latin-1")
+                elif name == b"x-client-id":
+                    client = value.decode("latin-1")
+        traffic_class = self.controller.classify(scope["path"], requested)
+        if traffic_class is None:
+            await self.app(scope, receive, send)
+            return
+        if client is None:
+            client = address
+
+        retry_after = await self.controller.acquire(traffic_class, client)
+        if retry_after is not None:
+            await _reject(send, retry_after)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(traffic_class, client, time.perf_counter() - start)
+
+
+async def _reject(send: Any, retry_after: float) -> None:
+    body = b'{"detail":"Server is busy, retry later"}'
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(math.ceil(retry_after)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def admission_enabled() -> bool:
+    return os.environ.get("ADMISSION_CONTROL", "1").lower() not in ("0", "false", "no")
@@ -0,0 +1,275 @@
+"""
+Blockwise all-pairs scoring of every stored resume against every open job.
+
+    python all_pairs.py --jobs jobs.jsonl --output data/all_pairs --top-k 20 --memory-mb 512
+
+Jobs come from a JSONL file, or from the job store filled by ``/scrape-job``
+when ``--jobs`` is omitted.
+
+Rather than calling ``analyze_match`` once per pair, the inputs are stacked
+into matrices once:
+
+    semantic   resume embeddings (R x d) @ job embeddings (d x J)
+    skills     unpacked resume skill bits (R x S) @ job skill bits (S x J),
+               divided by each job's skill count - calculate_skill_match
+    keywords   resume term frequencies over the job vocabulary (R x V, sparse)
+               @ job term presence (V x J) - calculate_keyword_density
+
+The R x J score matrix is produced in row blocks sized to ``--memory-mb``.
+Blocks run on a thread pool (numpy releases the GIL inside matrix products)
+and fold into a running top-K per resume and per job. Each finished block's
+per-resume results are appended to ``resume_top.jsonl`` straight away;
+``job_top.jsonl`` is written at the end and ``--matrix`` also stores the
+full score matrix as ``scores.npy``, filled block by block.
+
+``--memory-mb`` bounds the score blocks only. Every resume's text, the sparse
+resume term matrix and both top-K tables are held for the whole run on top of
+it, so their size grows with the store rather than with the budget.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from batch import load_jobs, prepare_jobs
+from job_store import DEFAULT_JOB_STORE_DIR, JobStore
+from resume_store import DEFAULT_STORE_DIR, ResumeStore
+from utils import SKILL_INDEX, SKILL_VOCABULARY
+
+# /analyze weights for skill match, keyword density and semantic similarity;
+# experience match needs a per-pair TF-IDF fit and is left out
+COMPONENT_WEIGHTS = {"skill_match": 0.35, "keyword_density": 0.20, "semantic_similarity": 0.20}
+COMPONENTS = list(COMPONENT_WEIGHTS)
+
+# Per pair in a block: float32 components (12) and combined score (4); the
+# component temporaries - skill product and its scaled copy, the keyword
+# .toarray() and np.minimum result (16); and in each of the two TopK.push
+# calls the negated copy, argpartition's working copy and int64 indices (24)
+BYTES_PER_PAIR = 12 + 4 + 16 + 2 * 24
+# Per resume row in a block: packed + unpacked float32 skill bits
+BYTES_PER_ROW = len(SKILL_VOCABULARY) * 5
+
+
+class TopK:
+    """Running top-k columns for each of n rows, with the score components of each"""
+
+    def __init__(self, n: int, k: int):
+        self.k = k
+        self.scores = np.full((n, k), -np.inf, dtype=np.float32)
+        self.ids = np.full((n, k), -1, dtype=np.int64)
+        self.parts = np.zeros((n, k, len(COMPONENTS)), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def push(self, rows: slice, scores: np.ndarray, ids: np.ndarray, parts: np.ndarray) -> None:
+        """Merge a (rows x m) block of scores for column ids, with (rows x m x c) components"""
+        k = min(self.k, scores.shape[1])
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, best, axis=1)
+        ids = ids[best]
+        parts = np.take_along_axis(parts, best[:, :, None], axis=1)
+        with self._lock:
+            all_scores = np.concatenate([self.scores[rows], scores], axis=1)
+            keep = np.argpartition(-all_scores, self.k - 1, axis=1)[:, :self.k]
+            self.scores[rows] = np.take_along_axis(all_scores, keep, axis=1)
+            self.ids[rows] = np.take_along_axis(np.concatenate([self.ids[rows], ids], axis=1), keep, axis=1)
+            self.parts[rows] = np.take_along_axis(np.concatenate([self.parts[rows], parts], axis=1), keep[:, :, None], axis=1)
+
+    def results(self, row: int) -> List[Tuple[int, float, np.ndarray]]:
+        """(column id, score, components) for one row, best first"""
+        order = np.argsort(-self.scores[row], kind="stable")
+        return [
+            (int(self.ids[row, i]), float(self.scores[row, i]), self.parts[row, i])
+            for i in order if self.ids[row, i] >= 0
+        ]
+
+
+def block_shape(n_rows: int, n_cols: int, row_bytes: int, memory_mb: float, workers: int) -> Tuple[int, int]:
+    """(rows, cols) of a score block whose pair and per-row buffers fit one worker's share of memory"""
+    budget = memory_mb * 1024 * 1024 / workers
+    # Whole job rows per block when they fit, otherwise one resume against a slice of jobs
+    cols = max(1, min(n_cols, int((budget - row_bytes) / BYTES_PER_PAIR)))
+    rows = max(1, min(n_rows, int(budget / (cols * BYTES_PER_PAIR + row_bytes))))
+    return rows, cols
+
+
+def unpack_skills(bits: np.ndarray) -> np.ndarray:
+    return np.unpackbits(bits, axis=1, count=len(SKILL_VOCABULARY)).astype(np.float32)
+
+
+def job_skill_matrix(job_skills: List[List[str]]) -> np.ndarray:
+    matrix = np.zeros((len(job_skills), len(SKILL_VOCABULARY)), dtype=np.float32)
+    for row, skills in enumerate(job_skills):
+        for skill in skills:
+            if skill in SKILL_INDEX:
+                matrix[row, SKILL_INDEX[skill]] = 1.0
+    return matrix
+
+
+def keyword_matrices(resume_texts: List[str], job_texts: List[str]) -> Tuple[Any, Any]:
+    """Sparse resume term frequencies and job term presence over the jobs' vocabulary"""
+    if not any(text.split() for text in job_texts):
+        # No job terms at all: every keyword density is zero
+        return (sparse.csr_matrix((len(resume_texts), 0), dtype=np.float32),
+                sparse.csc_matrix((0, len(job_texts)), dtype=np.float32))
+    vectorizer = CountVectorizer(tokenizer=str.split, token_pattern=None, lowercase=True, binary=False)
+    presence = (vectorizer.fit_transform(job_texts) > 0).astype(np.float32)
+    counts = vectorizer.transform(resume_texts).astype(np.float32).tocsr()
+    lengths = np.array([len(text.split()) for text in resume_texts], dtype=np.float32)
+    scale = np.divide(1.0, lengths, out=np.zeros_like(lengths), where=lengths > 0)
+    counts = counts.multiply(scale[:, None]).tocsr()
+    return counts, presence.T.tocsc()
+
+
+class AllPairsScorer:
+    """Blockwise resume x job scoring with running top-K in both directions"""
+
+    def __init__(self, resume_embeddings: np.ndarray, resume_skill_bits: np.ndarray, resume_texts: List[str],
+                 jobs: List[Dict[str, Any]], k: int = 10, memory_mb: float = 256, workers: int = 1):
+        self.resume_embeddings = resume_embeddings
+        self.resume_skill_bits = resume_skill_bits
+        self.jobs = jobs
+        self.k = k
+        self.workers = max(1, workers)
+
+        self.use_semantic = bool(jobs) and all(job["embedding"] is not None for job in jobs)
+        if self.use_semantic:
+            self.job_embeddings = np.stack([job["embedding"] for job in jobs]).astype(np.float32).T
+        self.job_skills = job_skill_matrix([job["skills"] for job in jobs]).T
+        counts = self.job_skills.sum(axis=0)
+        self.job_skill_scale = np.divide(1.0, counts, out=np.zeros_like(counts), where=counts > 0)
+        self.resume_terms, self.job_terms = keyword_matrices(resume_texts, [job["description"] for job in jobs])
+
+        weights = dict(COMPONENT_WEIGHTS)
+        if not self.use_semantic:
+            weights["semantic_similarity"] = 0.0
+        total = sum(weights.values())
+        self.weights = np.array([weights[name] / total for name in COMPONENTS], dtype=np.float32)
+
+        row_bytes = BYTES_PER_ROW + (resume_embeddings.shape[1] * 4 if self.use_semantic else 0)
+        self.block_rows, self.block_cols = block_shape(len(resume_texts), len(jobs), row_bytes, memory_mb, self.workers)
+
+    @property
+    def n_resumes(self) -> int:
+        return len(self.resume_skill_bits)
+
+    def score_block(self, rows: slice, cols: slice) -> Tuple[np.ndarray, np.ndarray]:
+        """Combined scores (rows x cols) and components (rows x cols x 3) for one block.
+
+        Semantic similarity is the raw cosine, unclipped, as in /analyze.
+        """
+        parts = np.empty((rows.stop - rows.start, cols.stop - cols.start, len(COMPONENTS)), dtype=np.float32)
+        parts[:, :, 0] = unpack_skills(self.resume_skill_bits[rows]) @ self.job_skills[:, cols] * self.job_skill_scale[cols]
+        parts[:, :, 1] = np.minimum(1.0, (self.resume_terms[rows] @ self.job_terms[:, cols]).toarray())
+        if self.use_semantic:
+            parts[:, :, 2] = self.resume_embeddings[rows] @ self.job_embeddings[:, cols]
+        else:
+            parts[:, :, 2] = 0.0
+        return parts @ self.weights, parts
+
+    def score_rows(self, rows: slice, resume_top: TopK, job_top: TopK, matrix: Optional[np.ndarray]) -> slice:
+        """Score one row block against every job block, folding results into both top-Ks"""
+        n_jobs = len(self.jobs)
+        for start in range(0, n_jobs, self.block_cols):
+            cols = slice(start, min(n_jobs, start + self.block_cols))
+            scores, parts = self.score_block(rows, cols)
+            if matrix is not None:
+                matrix[rows, cols] = scores
+            resume_top.push(rows, scores, np.arange(cols.start, cols.stop), parts)
+            job_top.push(cols, scores.T, np.arange(rows.start, rows.stop), parts.transpose(1, 0, 2))
+        return rows
+
+    def run(self, output_dir: str, resume_names: List[str], write_matrix: bool = False) -> Dict[str, Any]:
+        """Score all pairs, writing resume_top.jsonl incrementally and job_top.jsonl at the end"""
+        os.makedirs(output_dir, exist_ok=True)
+        n_resumes, n_jobs = self.n_resumes, len(self.jobs)
+        resume_top = TopK(n_resumes, self.k)
+        job_top = TopK(n_jobs, self.k)
+        matrix = None
+        if write_matrix:
+            matrix = np.lib.format.open_memmap(os.path.join(output_dir, "scores.npy"), mode="w+",
+                                               dtype=np.float32, shape=(n_resumes, n_jobs))
+
+        start = time.perf_counter()
+        blocks = [slice(s, min(n_resumes, s + self.block_rows)) for s in range(0, n_resumes, self.block_rows)] if n_jobs else []
+        done = 0
+        with open(os.path.join(output_dir, "resume_top.jsonl"), "w", encoding="utf-8") as out, \
+                ThreadPoolExecutor(self.workers) as pool:
+            futures = [pool.submit(self.score_rows, rows, resume_top, job_top, matrix) for rows in blocks]
+            for future in as_completed(futures):
+                rows = future.result()
+                for row in range(rows.start, rows.stop):
+                    out.write(json.dumps({
+                        "resume_id": row,
+                        "filename": resume_names[row],
+                        "matches": [self._match("job_id", self.jobs[i]["id"], score, parts)
+                                    for i, score, parts in resume_top.results(row)],
+                    }) + "\n")
+                out.flush()
+                done += rows.stop - rows.start
+                elapsed = time.perf_counter() - start
+                print(f"{done}/{n_resumes} resumes, {done * n_jobs / elapsed:,.0f} pairs/s", flush=True)
+
+        with open(os.path.join(output_dir, "job_top.jsonl"), "w", encoding="utf-8") as out:
+            for col, job in enumerate(self.jobs):
+                out.write(json.dumps({
+                    "job_id": job["id"],
+                    "matches": [self._match("resume_id", i, score, parts) for i, score, parts in job_top.results(col)],
+                }) + "\n")
+        if matrix is not None:
+            matrix.flush()
+
+        return {
+            "resumes": n_resumes,
+            "jobs": n_jobs,
+            "pairs": n_resumes * n_jobs,
+            "block": [self.block_rows, self.block_cols],
+            "elapsed_s": time.perf_counter() - start,
+        }
+
+    @staticmethod
+    def _match(key: str, value: Any, score: float, parts: np.ndarray) -> Dict[str, Any]:
+        match = {key: value, "score": round(score, 4)}
+        match.update({name: round(float(v), 4) for name, v in zip(COMPONENTS, parts)})
+        return match
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", help="JSONL file of {\"id\", \"description\"} jobs (default: the job store)")
+    parser.add_argument("--job-store", default=os.environ.get("JOB_STORE_DIR", DEFAULT_JOB_STORE_DIR))
+    parser.add_argument("--output", required=True, help="Output directory")
+    parser.add_argument("--store", default=os.environ.get("RESUME_STORE_DIR", DEFAULT_STORE_DIR))
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--memory-mb", type=float, default=256,
+                        help="Budget for score blocks across all workers; resume texts and term matrix are extra")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--matrix", action="store_true", help="Also write the full score matrix to scores.npy")
+    args = parser.parse_args()
+
+    store = ResumeStore(args.store)
+    embeddings, skill_bits = store.arrays()
+    # Only the text and filename columns are decoded, not whole records
+    rows = range(len(embeddings))
+    texts = [store.table.get("text", i) for i in rows]
+    filenames = [store.table.get("filename", i) for i in rows]
+    jobs = prepare_jobs(load_jobs(args.jobs)) if args.jobs else JobStore(args.job_store).prepared_jobs()
+    if not jobs:
+        source = args.jobs or f"the job store at {args.job_store}"
+        print(f"No jobs found in {source}; nothing to score", flush=True)
+        return
+    scorer = AllPairsScorer(embeddings, skill_bits, texts, jobs,
+                            k=args.top_k, memory_mb=args.memory_mb, workers=args.workers)
+    stats = scorer.run(args.output, filenames, write_matrix=args.matrix)
+    print(f"Scored {stats['pairs']:,} pairs ({stats['resumes']} resumes x {stats['jobs']} jobs) "
+          f"in {stats['elapsed_s']:.1f}s with {stats['block'][0]}x{stats['block'][1]} blocks", flush=True)
+
+
+if __name__ == "__main__":
+    main()
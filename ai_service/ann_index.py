@@ -0,0 +1,346 @@
+"""
+Approximate nearest-neighbour index for semantic job search.
+
+The index is an inverted-file (IVF) layout built locally with numpy: a
+spherical k-means coarse quantizer splits the job embeddings into ``n_lists``
+cells and a query only scores the ``nprobe`` cells closest to it. ``nprobe``
+is the recall/latency knob - ``nprobe == n_lists`` is an exact search.
+
+Until ``MIN_POINTS_PER_LIST * n_lists`` vectors have been added the index is
+not trained and searches scan every vector exactly; the quantizer is then
+fitted on all of them. ``train`` may also be called explicitly at any time and
+re-assigns whatever the index already holds.
+
+Persisted vectors are stored grouped by cell (CSR style) and are memory-mapped
+on load. Inserts after a load go to a small in-memory delta per cell and
+deletes are tombstones; ``save`` compacts everything back into one layout.
+Each save writes a new version directory and then swaps the ``CURRENT``
+pointer file, so ``load`` always sees one complete version.
+"""
+import json
+import os
+import shutil
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from utils import encode_texts
+
+META_FILE = "meta.json"
+CENTROIDS_FILE = "centroids.npy"
+VECTORS_FILE = "vectors.npy"
+IDS_FILE = "ids.npy"
+OFFSETS_FILE = "offsets.npy"
+CURRENT_FILE = "CURRENT"
+
+# k-means needs a few dozen points per cell to place centroids sensibly
+MIN_POINTS_PER_LIST = 39
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Return a float32 copy of the vectors scaled to unit length"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class IVFIndex:
+    """Inverted-file cosine index with incremental inserts and deletes"""
+
+    def __init__(self, dim: int, n_lists: int = 256, nprobe: int = 8, seed: int = 0):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+
+        # Compacted base layout (possibly memory-mapped)
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(2, dtype=np.int64)
+        self._sorted_base_ids: Optional[np.ndarray] = None
+        self._tombstones: Set[int] = set()
+
+        # Inserts since the last compaction, keyed by cell (all in cell 0 until trained)
+        self._delta_vectors: Dict[int, np.ndarray] = {}
+        self._delta_ids: Dict[int, np.ndarray] = {}
+        self._delta_location: Dict[int, int] = {}
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def n_cells(self) -> int:
+        """Cells actually in use: the trained centroids, or one while untrained"""
+        return len(self.centroids) if self.centroids is not None else 1
+
+    def __len__(self) -> int:
+        return len(self._ids) - len(self._tombstones) + len(self._delta_location)
+
+    def __contains__(self, item_id: int) -> bool:
+        item_id = int(item_id)
+        if item_id in self._delta_location:
+            return True
+        return bool(self._in_base(np.array([item_id]))[0]) and item_id not in self._tombstones
+
+    def train(self, vectors: Optional[np.ndarray] = None, n_iter: int = 20, max_samples: int = 100_000) -> None:
+        """Fit the coarse quantizer with spherical k-means and re-assign the stored vectors.
+
+        Trains on the given vectors, or on the ones already in the index.
+        """
+        ids, stored, _ = self._compacted()
+        data = _normalize(stored if vectors is None else vectors)
+        if len(data) == 0:
+            raise ValueError("Cannot train an index without vectors")
+
+        rng = np.random.default_rng(self.seed)
+        if len(data) > max_samples:
+            data = data[rng.choice(len(data), max_samples, replace=False)]
+
+        cells = min(self.n_lists, max(1, len(data) // MIN_POINTS_PER_LIST))
+        centroids = data[rng.choice(len(data), cells, replace=False)].copy()
+        for _ in range(n_iter):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, data)
+            empty = ~sums.any(axis=1)
+            if empty.any():
+                # Re-seed empty cells so every list stays useful
+                sums[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+            centroids = _normalize(sums)
+
+        self.centroids = centroids
+        self._tombstones = set()
+        self._delta_ids, self._delta_vectors, self._delta_location = {}, {}, {}
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._offsets = np.zeros(cells + 1, dtype=np.int64)
+        self._sorted_base_ids = None
+        if len(ids):
+            self._insert(ids, stored)
+            self.compact()
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        assert self.centroids is not None
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def _in_base(self, ids: np.ndarray) -> np.ndarray:
+        """Mask of which ids are in the base layout, via a sorted copy of its ids"""
+        if self._sorted_base_ids is None:
+            self._sorted_base_ids = np.sort(self._ids)
+        if len(self._sorted_base_ids) == 0:
+            return np.zeros(len(ids), dtype=bool)
+        pos = np.minimum(np.searchsorted(self._sorted_base_ids, ids), len(self._sorted_base_ids) - 1)
+        return self._sorted_base_ids[pos] == ids
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """Insert or replace vectors; the first call trains the index if needed"""
+        ids_arr = np.asarray(ids, dtype=np.int64).reshape(-1)
+        data = _normalize(vectors)
+        if data.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {data.shape[1]}")
+        if len(ids_arr) != len(data):
+            raise ValueError("ids and vectors must have the same length")
+        if len(np.unique(ids_arr)) != len(ids_arr):
+            raise ValueError("ids must be unique within one add() call")
+
+        self.remove(ids_arr.tolist())
+        self._insert(ids_arr, data)
+        if not self.is_trained and len(self) >= MIN_POINTS_PER_LIST * self.n_lists:
+            self.train()
+
+    def _insert(self, ids_arr: np.ndarray, data: np.ndarray) -> None:
+        """Append normalized vectors to the delta buffer of their cell"""
+        assignment = self._assign(data) if self.is_trained else np.zeros(len(data), dtype=np.int64)
+        for list_no in np.unique(assignment).tolist():
+            mask = assignment == list_no
+            new_ids = ids_arr[mask]
+            if list_no in self._delta_ids:
+                self._delta_ids[list_no] = np.concatenate([self._delta_ids[list_no], new_ids])
+                self._delta_vectors[list_no] = np.concatenate([self._delta_vectors[list_no], data[mask]])
+            else:
+                self._delta_ids[list_no] = new_ids
+                self._delta_vectors[list_no] = data[mask]
+            for item_id in new_ids.tolist():
+                self._delta_location[item_id] = list_no
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Delete ids from the index, returning how many were present"""
+        removed = 0
+        ids_arr = np.asarray(list(ids), dtype=np.int64).reshape(-1)
+        in_base = self._in_base(ids_arr)
+        for item_id, is_base in zip(ids_arr.tolist(), in_base.tolist()):
+            list_no = self._delta_location.pop(item_id, None)
+            if list_no is not None:
+                keep = self._delta_ids[list_no] != item_id
+                self._delta_ids[list_no] = self._delta_ids[list_no][keep]
+                self._delta_vectors[list_no] = self._delta_vectors[list_no][keep]
+                removed += 1
+            if is_base and item_id not in self._tombstones:
+                self._tombstones.add(item_id)
+                if list_no is None:
+                    removed += 1
+        return removed
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (ids, cosine scores) of the k nearest vectors, best first"""
+        ids, scores = self.search_batch(np.atleast_2d(query), k, nprobe)
+        return ids[0], scores[0]
+
+    def search_batch(self, queries: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Search several queries; rows with fewer than k hits are padded with -1/-inf"""
+        if nprobe is None:
+            nprobe = self.nprobe
+        if nprobe < 1:
+            raise ValueError(f"nprobe must be at least 1, got {nprobe}")
+
+        queries = _normalize(queries)
+        out_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        out_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        if len(self) == 0:
+            return out_ids, out_scores
+
+        if self.centroids is None:
+            # Untrained: a single cell holding everything, searched exactly
+            probe, centroid_scores = 1, np.zeros((len(queries), 1), dtype=np.float32)
+        else:
+            probe = min(nprobe, len(self.centroids))
+            centroid_scores = queries @ self.centroids.T
+        tombstones = np.fromiter(self._tombstones, dtype=np.int64, count=len(self._tombstones))
+
+        for row, query in enumerate(queries):
+            lists = _top_k(centroid_scores[row], probe).tolist()
+            cand_ids, cand_vectors = self._gather(lists, tombstones)
+            if len(cand_ids) == 0:
+                continue
+            scores = cand_vectors @ query
+            best = _top_k(scores, k)
+            out_ids[row, :len(best)] = cand_ids[best]
+            out_scores[row, :len(best)] = scores[best]
+        return out_ids, out_scores
+
+    def _gather(self, lists: List[int], tombstones: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        id_parts: List[np.ndarray] = []
+        vector_parts: List[np.ndarray] = []
+        for list_no in lists:
+            start, end = int(self._offsets[list_no]), int(self._offsets[list_no + 1])
+            if end > start:
+                base_ids = self._ids[start:end]
+                base_vectors = self._vectors[start:end]
+                if len(tombstones):
+                    alive = ~np.isin(base_ids, tombstones)
+                    base_ids, base_vectors = base_ids[alive], base_vectors[alive]
+                id_parts.append(base_ids)
+                vector_parts.append(base_vectors)
+            if list_no in self._delta_ids and len(self._delta_ids[list_no]):
+                id_parts.append(self._delta_ids[list_no])
+                vector_parts.append(self._delta_vectors[list_no])
+        if not id_parts:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, self.dim), dtype=np.float32)
+        return np.concatenate(id_parts), np.concatenate(vector_parts)
+
+    def _compacted(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        tombstones = np.fromiter(self._tombstones, dtype=np.int64, count=len(self._tombstones))
+        id_parts: List[np.ndarray] = []
+        vector_parts: List[np.ndarray] = []
+        offsets = np.zeros(self.n_cells + 1, dtype=np.int64)
+        for list_no in range(self.n_cells):
+            ids, vectors = self._gather([list_no], tombstones)
+            id_parts.append(ids)
+            vector_parts.append(vectors)
+            offsets[list_no + 1] = offsets[list_no] + len(ids)
+        return np.concatenate(id_parts), np.concatenate(vector_parts), offsets
+
+    def compact(self) -> None:
+        """Fold the delta buffers and tombstones into the base layout in memory"""
+        self._ids, self._vectors, self._offsets = self._compacted()
+        self._sorted_base_ids = None
+        self._tombstones = set()
+        self._delta_ids, self._delta_vectors, self._delta_location = {}, {}, {}
+
+    def save(self, path: str) -> None:
+        """Write the compacted index as a new version under a directory"""
+        if not self.is_trained:
+            if len(self) == 0:
+                raise ValueError("Cannot save an empty untrained index")
+            self.train()
+        assert self.centroids is not None
+        ids, vectors, offsets = self._compacted()
+        os.makedirs(path, exist_ok=True)
+
+        # Every file of a version goes into its own directory; only when it is
+        # complete does CURRENT switch to it, so a load never mixes versions
+        version = f"v{time.time_ns()}"
+        version_path = os.path.join(path, version)
+        os.makedirs(version_path)
+        for name, array in ((CENTROIDS_FILE, self.centroids), (VECTORS_FILE, vectors),
+                            (IDS_FILE, ids), (OFFSETS_FILE, offsets)):
+            with open(os.path.join(version_path, name), "wb") as f:
+                np.save(f, array)
+        meta = {"dim": self.dim, "n_lists": self.n_lists, "nprobe": self.nprobe,
+                "seed": self.seed, "count": int(len(ids))}
+        with open(os.path.join(version_path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        previous = _current_version(path)
+        tmp_path = os.path.join(path, CURRENT_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(path, CURRENT_FILE))
+
+        # Keep the version just replaced for loads that read CURRENT before the
+        # swap; anything older is no longer reachable
+        for name in os.listdir(path):
+            if name.startswith("v") and name not in (version, previous):
+                shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "IVFIndex":
+        """Load the current saved version, memory-mapping the vector data by default"""
+        version = _current_version(path)
+        if version is None:
+            raise FileNotFoundError(f"No saved index in {path}")
+        version_path = os.path.join(path, version)
+        with open(os.path.join(version_path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(meta["dim"], meta["n_lists"], meta["nprobe"], meta.get("seed", 0))
+        mmap_mode = "r" if mmap else None
+        index.centroids = np.load(os.path.join(version_path, CENTROIDS_FILE))
+        index._vectors = np.load(os.path.join(version_path, VECTORS_FILE), mmap_mode=mmap_mode)
+        index._ids = np.load(os.path.join(version_path, IDS_FILE), mmap_mode=mmap_mode)
+        index._offsets = np.load(os.path.join(version_path, OFFSETS_FILE))
+        return index
+
+
+def _current_version(path: str) -> Optional[str]:
+    try:
+        with open(os.path.join(path, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def build_job_index(job_ids: Sequence[int], job_texts: Sequence[str], n_lists: int = 256, nprobe: int = 8) -> IVFIndex:
+    """Build an index over job descriptions using the semantic similarity embeddings"""
+    embeddings = encode_texts(list(job_texts))
+    index = IVFIndex(embeddings.shape[1], n_lists=n_lists, nprobe=nprobe)
+    index.train(embeddings)
+    index.add(job_ids, embeddings)
+    return index
+
+
+def search_jobs(index: IVFIndex, resume_text: str, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+    """Return the (job id, cosine similarity) pairs closest to a resume"""
+    ids, scores = index.search(encode_texts([resume_text])[0], k, nprobe)
+    return [(int(i), float(s)) for i, s in zip(ids, scores) if i >= 0]
@@ -0,0 +1,337 @@
+"""
+Offline batch scoring of a resume directory against a JSONL file of jobs.
+
+    python batch.py --resumes data/resumes --jobs jobs.jsonl --output scores.jsonl --workers 4
+
+Each line of the jobs file is ``{"id": ..., "description": ...}``. Every
+resume (PDF, DOCX or plain text) is scored against every job with the same
+extraction and scoring functions as ``/analyze``, writing one row per pair.
+
+Job skills and embeddings are computed once up front and handed to the
+workers. Resumes are split into chunks; a worker extracts a chunk's texts,
+encodes them in one batch and scores them against all jobs. Completed chunks
+are appended to the output and recorded in a checkpoint file, so an
+interrupted run picks up where it stopped when started again with the same
+arguments. ``--format parquet`` writes one part file per chunk into the
+output directory and needs ``pyarrow``.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+# Worker state, set by init_worker
+_jobs: List[Dict[str, Any]] = []
+
+
+def list_resumes(directory: str) -> List[str]:
+    """Resume files under directory, as sorted relative paths"""
+    names = []
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if filename.lower().endswith(RESUME_EXTENSIONS):
+                names.append(os.path.relpath(os.path.join(root, filename), directory))
+    return sorted(names)
+
+
+def load_jobs(path: str) -> List[Dict[str, str]]:
+    jobs = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            jobs.append({"id": str(job.get("id", line_number)), "description": job["description"]})
+    return jobs
+
+
+def read_resume_text(path: str) -> str:
+    from main import extract_text_from_docx, extract_text_from_pdf
+
+    with open(path, "rb") as f:
+        content = f.read()
+    lower = path.lower()
+    if lower.endswith(".pdf"):
+        return extract_text_from_pdf(content)
+    if lower.endswith(".docx"):
+        return extract_text_from_docx(content)
+    return content.decode("utf-8", errors="replace")
+
+
+def _encode(texts: List[str]) -> Optional[np.ndarray]:
+    import utils
+
+    if utils.model is None or not texts:
+        return None
+    return utils.encode_texts(texts)
+
+
+def prepare_jobs(jobs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Extract skills and embeddings of every job once"""
+    from utils import extract_skills
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        skills = [extract_skills(job["description"]) for job in jobs]
+        embeddings = _encode([job["description"] for job in jobs])
+    return [
+        {**job, "skills": skills[i], "embedding": None if embeddings is None else embeddings[i]}
+        for i, job in enumerate(jobs)
+    ]
+
+
+def score_resume(name: str, text: str, embedding: Optional[np.ndarray],
+                 jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Score one resume against every prepared job"""
+    from main import (calculate_experience_match, calculate_keyword_density,
+                      calculate_overall_score, calculate_skill_match)
+    from utils import calculate_semantic_similarity, extract_skills
+
+    resume_skills = extract_skills(text)
+    rows = []
+    for job in jobs:
+        job_skills = job["skills"]
+        skill_match = calculate_skill_match(resume_skills, job_skills)
+        experience_match = float(calculate_experience_match(text, job["description"]))
+        keyword_density = calculate_keyword_density(text, job["description"])
+        if embedding is not None and job["embedding"] is not None:
+            semantic_similarity = float(np.dot(embedding, job["embedding"]))
+        else:
+            semantic_similarity = calculate_semantic_similarity(text, job["description"])
+        rows.append({
+            "resume": name,
+            "job_id": job["id"],
+            "overall_score": calculate_overall_score(skill_match, experience_match, keyword_density, semantic_similarity),
+            "skill_match": int(skill_match * 100),
+            "experience_match": int(experience_match * 100),
+            "keyword_density": int(keyword_density * 100),
+            "semantic_similarity": int(semantic_similarity * 100),
+            "matching_skills": sorted(set(resume_skills) & set(job_skills)),
+            "missing_skills": sorted(set(job_skills) - set(resume_skills)),
+        })
+    return rows
+
+
+def init_worker(jobs: List[Dict[str, Any]], threads: Optional[int] = None) -> None:
+    """Set the jobs to score against; pool workers also split the cores via threads"""
+    global _jobs
+    _jobs = jobs
+    torch = sys.modules.get("torch")
+    if torch is not None and threads is not None:
+        torch.set_num_threads(threads)
+
+
+def score_chunk(directory: str, names: List[str]) -> Tuple[List[str], List[Dict[str, Any]], List[Tuple[str, str]]]:
+    """Score a chunk of resumes. Returns (scored names, rows, (name, error) failures)"""
+    scored: List[str] = []
+    texts: List[str] = []
+    failures: List[Tuple[str, str]] = []
+    rows: List[Dict[str, Any]] = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in names:
+            try:
+                texts.append(read_resume_text(os.path.join(directory, name)))
+                scored.append(name)
+            except Exception as e:
+                failures.append((name, str(e)))
+        embeddings = _encode(texts)
+        for i, (name, text) in enumerate(zip(scored, texts)):
+            rows += score_resume(name, text, None if embeddings is None else embeddings[i], _jobs)
+    return scored, rows, failures
+
+
+class Checkpoint:
+    """Append-only log of completed chunks and the output position after each"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Tuple[Set[str], int]:
+        done: Set[str] = set()
+        position = 0
+        if not os.path.exists(self.path):
+            return done, position
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final line from an interrupted write
+                done.update(entry["resumes"])
+                position = entry["position"]
+        return done, position
+
+    def record(self, resumes: List[str], position: int) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"resumes": resumes, "position": position}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class JsonlWriter:
+    """Single JSONL file; the position is its byte length"""
+
+    def __init__(self, path: str, position: int):
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        self._file = open(path, mode)
+        # Drop rows written after the last checkpoint
+        self._file.truncate(position)
+        self._file.seek(position)
+
+    def write(self, rows: List[Dict[str, Any]]) -> int:
+        from responses import dumps
+
+        self._file.write(b"".join(dumps(row) + b"\n" for row in rows))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """Directory of part files; the position is the number of parts"""
+
+    def __init__(self, path: str, position: int):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.path = path
+        self.position = position
+        os.makedirs(path, exist_ok=True)
+        # Drop parts written after the last checkpoint
+        for filename in os.listdir(path):
+            if filename.startswith("part-") and int(filename[5:10]) >= position:
+                os.remove(os.path.join(path, filename))
+
+    def write(self, rows: List[Dict[str, Any]]) -> int:
+        part = os.path.join(self.path, f"part-{self.position:05d}.parquet")
+        self._pq.write_table(self._pa.Table.from_pylist(rows), part)
+        self.position += 1
+        return self.position
+
+    def close(self) -> None:
+        pass
+
+
+@contextlib.contextmanager
+def all_torch_threads() -> Iterator[None]:
+    """Let torch use every available core inside the block, then restore its thread count.
+
+    serve.preload() pins the parent to one thread so the pool can fork safely;
+    encoding the jobs in the parent should still use the whole machine.
+    """
+    torch = sys.modules.get("torch")
+    if torch is None:
+        yield
+        return
+    from serve import available_cores
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(available_cores())
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def run(resumes_dir: str, jobs_path: str, output: str, output_format: str = "jsonl",
+        workers: int = 1, chunk_size: int = 16, checkpoint_path: Optional[str] = None) -> Dict[str, Any]:
+    """Score every resume against every job, resuming from the checkpoint if present"""
+    checkpoint = Checkpoint(checkpoint_path or output.rstrip("/\\") + ".checkpoint")
+    done, position = checkpoint.load()
+    pending = [name for name in list_resumes(resumes_dir) if name not in done]
+    with all_torch_threads():
+        jobs = prepare_jobs(load_jobs(jobs_path))
+    writer = ParquetWriter(output, position) if output_format == "parquet" else JsonlWriter(output, position)
+    print(f"{len(done)} resumes already scored, {len(pending)} pending against {len(jobs)} jobs", flush=True)
+
+    stats = {"resumes": 0, "pairs": 0, "failed": 0, "elapsed_s": 0.0}
+    start = time.perf_counter()
+    chunks = list(chunked(pending, chunk_size))
+    pool = None
+    try:
+        if workers > 1 and chunks:
+            from serve import available_cores
+
+            threads = max(1, available_cores() // workers)
+            methods = multiprocessing.get_all_start_methods()
+            # Forked workers share the parent's loaded model copy-on-write
+            context = multiprocessing.get_context("fork" if "fork" in methods else None)
+            pool = context.Pool(workers, initializer=init_worker, initargs=(jobs, threads))
+            results = pool.imap_unordered(_score_chunk_args, [(resumes_dir, chunk) for chunk in chunks])
+        else:
+            # In-process: leave the caller's torch thread count alone
+            init_worker(jobs)
+            results = (score_chunk(resumes_dir, chunk) for chunk in chunks)
+
+        for scored, rows, failures in results:
+            for name, error in failures:
+                print(f"Failed to read {name}: {error}", flush=True)
+            if scored:
+                position = writer.write(rows)
+                checkpoint.record(scored, position)
+            stats["resumes"] += len(scored)
+            stats["pairs"] += len(rows)
+            stats["failed"] += len(failures)
+            elapsed = time.perf_counter() - start
+            print(f"{stats['resumes'] + stats['failed']}/{len(pending)} resumes, "
+                  f"{stats['resumes'] / elapsed:.1f} resumes/s, {stats['pairs'] / elapsed:.1f} pairs/s", flush=True)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        writer.close()
+
+    stats["elapsed_s"] = time.perf_counter() - start
+    return stats
+
+
+def _score_chunk_args(args: Tuple[str, List[str]]) -> Tuple[List[str], List[Dict[str, Any]], List[Tuple[str, str]]]:
+    return score_chunk(*args)
+
+
+def main() -> None:
+    from serve import available_cores, preload
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", required=True, help="Directory of PDF/DOCX/TXT resumes")
+    parser.add_argument("--jobs", required=True, help="JSONL file of {\"id\", \"description\"} jobs")
+    parser.add_argument("--output", required=True, help="JSONL file, or directory for parquet")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--workers", type=int, default=available_cores(),
+                        help="Worker processes (default: available cores)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Resumes per work unit")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        preload()
+    try:
+        stats = run(args.resumes, args.jobs, args.output, args.format, args.workers,
+                    args.chunk_size, args.checkpoint)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    print(f"Scored {stats['resumes']} resumes ({stats['pairs']} pairs) in {stats['elapsed_s']:.1f}s, "
+          f"{stats['failed']} failed", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Benchmarks for the AI service. Run them from ``ai_service/`` with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,56 @@
+"""
+Payload size and serialization time of /analyze per response view.
+
+    python -m benchmarks.bench_analyze_payload --repeat 5 40
+
+The "baseline" row is the previous behaviour: the full dict encoded by the
+stdlib json module without compression.
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import json
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.common import measure, write_results
+from benchmarks.fixtures import SAMPLE_JOB_DESCRIPTION, sample_resume_text
+from main import ANALYSIS_VIEWS, AnalysisResponse, build_analysis
+from responses import dumps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, nargs="+", default=[5, 40],
+                        help="Experience entries in the sample resume")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    print(f"{'resume':>7} {'view':<9} {'bytes':>8} {'gzip':>7} {'serialize us':>13}")
+    for repeat in args.repeat:
+        with contextlib.redirect_stdout(io.StringIO()):
+            analysis = build_analysis(sample_resume_text(repeat), SAMPLE_JOB_DESCRIPTION)
+
+        rows = [("baseline", lambda: json.dumps(analysis).encode("utf-8"))]
+        for view, selected in ANALYSIS_VIEWS.items():
+            include = None if selected is None else {name: True for name in selected}
+            rows.append((view, lambda include=include: dumps(
+                AnalysisResponse(**analysis).model_dump(include=include, exclude_unset=True))))
+
+        for name, serialize in rows:
+            body = serialize()
+            compressed = len(gzip.compress(body)) if len(body) >= 1000 else len(body)
+            median = float(np.median(measure(serialize, repeat=args.runs)))
+            print(f"{repeat:>7} {name:<9} {len(body):>8,} {compressed:>7,} {median * 1e6:>13.1f}")
+            results.append({"resume_repeat": repeat, "view": name, "bytes": len(body),
+                            "gzip_bytes": compressed, "serialize_median_s": median})
+
+    write_results(args.output, "analyze_payload", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Recall@K and QPS of the IVF job index against brute-force cosine scoring.
+
+    python -m benchmarks.bench_ann --jobs 200000 --queries 500 --nprobe 1 4 16 64
+
+Vectors are synthetic clustered unit vectors with the dimensionality of
+all-MiniLM-L6-v2, so the benchmark runs without downloading the model.
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ann_index import IVFIndex, _normalize, _top_k
+from benchmarks.common import write_results
+
+
+def synthetic_embeddings(count: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered unit vectors, roughly shaped like job-description embeddings"""
+    centers = _normalize(rng.standard_normal((clusters, dim)))
+    labels = rng.integers(0, clusters, count)
+    noise = rng.standard_normal((count, dim)).astype(np.float32) * (0.6 / np.sqrt(dim))
+    return _normalize(centers[labels] + noise)
+
+
+def brute_force(jobs: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    return np.stack([_top_k(jobs @ q, k) for q in queries])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--lists", type=int, default=512)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    jobs = synthetic_embeddings(args.jobs, args.dim, args.clusters, rng)
+    queries = synthetic_embeddings(args.queries, args.dim, args.clusters, rng)
+
+    start = time.perf_counter()
+    truth = brute_force(jobs, queries, args.k)
+    brute_qps = args.queries / (time.perf_counter() - start)
+    print(f"brute force: {brute_qps:,.1f} QPS over {args.jobs:,} jobs")
+
+    start = time.perf_counter()
+    index = IVFIndex(args.dim, n_lists=args.lists)
+    index.train(jobs)
+    index.add(np.arange(args.jobs), jobs)
+    index.compact()
+    print(f"index build: {time.perf_counter() - start:.2f}s ({args.lists} lists)")
+
+    results: List[Dict[str, Any]] = []
+    print(f"{'nprobe':>7} {'recall@' + str(args.k):>10} {'QPS':>10} {'speedup':>8}")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        found, _ = index.search_batch(queries, args.k, nprobe=nprobe)
+        qps = args.queries / (time.perf_counter() - start)
+        recall = float(np.mean([len(set(f.tolist()) & set(t.tolist())) / args.k for f, t in zip(found, truth)]))
+        results.append({"nprobe": nprobe, "recall_at_k": recall, "qps": qps})
+        print(f"{nprobe:>7} {recall:>10.3f} {qps:>10,.1f} {qps / brute_qps:>7.1f}x")
+
+    write_results(args.output, "ann", {
+        "jobs": args.jobs, "queries": args.queries, "k": args.k, "lists": args.lists,
+        "brute_force_qps": brute_qps, "index": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Speed and text coverage of the streaming DOCX extractor against python-docx.
+
+    python -m benchmarks.bench_docx --repeat 5 200
+
+Coverage is the share of each template's marker tokens present in the output.
+"""
+import argparse
+import io
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from docx import Document
+
+from benchmarks.common import measure, write_results
+from benchmarks.fixtures import docx_fixtures
+from docx_extractor import extract_docx_text
+
+
+def python_docx_text(content: bytes) -> str:
+    """The previous extract_text_from_docx implementation"""
+    doc = Document(io.BytesIO(content))
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text
+
+
+EXTRACTORS: Dict[str, Callable[[bytes], str]] = {
+    "python_docx": python_docx_text,
+    "streaming": extract_docx_text,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, nargs="+", default=[5, 200],
+                        help="Experience entries per fixture (controls document size)")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    print(f"{'fixture':<22} {'extractor':<12} {'median ms':>10} {'coverage':>9}")
+    for repeat in args.repeat:
+        for name, (content, tokens) in docx_fixtures(repeat).items():
+            for extractor_name, extractor in EXTRACTORS.items():
+                text = extractor(content)
+                coverage = sum(token in text for token in tokens) / len(tokens)
+                median = float(np.median(measure(lambda: extractor(content), repeat=args.runs)))
+                label = f"{name}[{repeat}]"
+                print(f"{label:<22} {extractor_name:<12} {median * 1000:>10.2f} {coverage:>9.0%}")
+                results.append({"fixture": name, "repeat": repeat, "bytes": len(content),
+                                "extractor": extractor_name, "median_s": median, "coverage": coverage})
+
+    write_results(args.output, "docx", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Per-worker memory and throughput scaling of the preforked server.
+
+    python -m benchmarks.bench_prefork --workers 1 2 4 --requests 200
+
+For each worker count this starts ``serve.py``, reads RSS/PSS of every
+worker from /proc, then drives /analyze over HTTP. PSS splits shared pages
+between the processes that map them, so the summed PSS is the real memory
+cost; a worker's private bytes are what each extra worker adds. Linux only.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import write_results
+from benchmarks.fixtures import job_description, sample_resume_text
+from benchmarks.load import run_load
+from serve import memory_usage, worker_pids
+
+MB = 1024 * 1024
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 300.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"serve.py exited with status {process.returncode}")
+        try:
+            if httpx.get(base_url + "/openapi.json", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError("serve.py did not become ready")
+
+
+def measure_workers(workers: int, port: int, requests: int) -> Dict[str, Any]:
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port),
+         "--host", "127.0.0.1", "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(base_url, process)
+        body = {"resume_text": sample_resume_text(20), "job_description": job_description("medium"), "resume_data": {}}
+        make_request = lambda i: {"method": "POST", "url": "/analyze", "json": body}
+        asyncio.run(run_load(make_request, workers * 2, workers, base_url=base_url))  # warm every worker
+
+        pids = [process.pid] if workers <= 1 else worker_pids(process.pid)
+        memory = [memory_usage(pid) for pid in pids]
+        master = memory_usage(process.pid)
+        stats = asyncio.run(run_load(make_request, requests, workers * 2, base_url=base_url))
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+    total_pss = sum(m["pss"] for m in memory) + (master["pss"] if workers > 1 else 0)
+    return {
+        "workers": workers,
+        "worker_memory": memory,
+        "master_memory": master,
+        "total_pss": total_pss,
+        "load": stats,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("bench_prefork needs Linux /proc/<pid>/smaps_rollup")
+
+    results: List[Dict[str, Any]] = []
+    print(f"{'workers':>7} {'RSS/worker MB':>14} {'private/worker MB':>18} {'total PSS MB':>13} {'req/s':>8} {'p95 ms':>8}")
+    for workers in args.workers:
+        result = measure_workers(workers, args.port, args.requests)
+        results.append(result)
+        memory = result["worker_memory"]
+        rss = sum(m["rss"] for m in memory) / len(memory) / MB
+        private = sum(m["private_clean"] + m["private_dirty"] for m in memory) / len(memory) / MB
+        print(f"{workers:>7} {rss:>14.1f} {private:>18.1f} {result['total_pss'] / MB:>13.1f} "
+              f"{result['load']['throughput_rps']:>8.1f} {result['load']['p95_s'] * 1000:>8.1f}")
+
+    write_results(args.output, "prefork", results)
+
+
+if __name__ == "__main__":
+    main()
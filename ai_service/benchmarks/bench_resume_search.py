@@ -0,0 +1,66 @@
+"""
+Latency of ranking a job description against a large resume store.
+
+    python -m benchmarks.bench_resume_search --resumes 500000
+
+The store files are synthesized directly with numpy (random skill bitsets and
+unit embeddings), so building a 500k-resume store takes seconds.
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import measure, write_results
+from resume_store import EMBEDDING_DIM, ResumeStore
+from utils import SKILL_VOCABULARY
+
+
+def build_store(path: str, count: int, rng: np.random.Generator) -> ResumeStore:
+    store = ResumeStore(path)
+    skills = rng.random((count, len(SKILL_VOCABULARY))) < 0.04
+    embeddings = rng.standard_normal((count, EMBEDDING_DIM)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    def write(name: str, data: bytes) -> None:
+        with open(os.path.join(path, name), "wb") as f:
+            f.write(data)
+
+    embeddings.tofile(os.path.join(path, "embedding.col"))
+    np.packbits(skills, axis=1).tofile(os.path.join(path, "skill_bits.col"))
+    np.zeros(count, dtype=np.int32).tofile(os.path.join(path, "experience_years.col"))
+    for column, value in (("skill_ids", b""), ("filename", b"synthetic.pdf"), ("text", b""),
+                          ("sections", b"{}"), ("education", b"[]")):
+        write(column + ".data", value * count)
+        (np.arange(1, count + 1, dtype=np.int64) * len(value)).tofile(os.path.join(path, column + ".ends"))
+    np.arange(count, dtype=np.int64).tofile(os.path.join(path, "rows.commit"))
+    return ResumeStore(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=500_000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as path:
+        store = build_store(path, args.resumes, rng)
+        job_skills = list(rng.choice(SKILL_VOCABULARY, 8, replace=False))
+        job_embedding = rng.standard_normal(EMBEDDING_DIM).astype(np.float32)
+        job_embedding /= np.linalg.norm(job_embedding)
+
+        timings = measure(lambda: store.top_k(job_skills, job_embedding, args.top_k), repeat=args.repeat)
+
+    median = float(np.median(timings))
+    print(f"{args.resumes:,} resumes, top {args.top_k}: median {median * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms")
+    write_results(args.output, "resume_search", {
+        "resumes": args.resumes, "top_k": args.top_k, "timings_s": timings, "median_s": median,
+    })
+
+
+if __name__ == "__main__":
+    main()
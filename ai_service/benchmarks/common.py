@@ -0,0 +1,43 @@
+"""Shared helpers for the benchmark scripts."""
+import json
+import os
+import platform
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, warmup: int = 1,
+            setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """Run func repeatedly and return the wall time of each run in seconds; setup runs untimed before each"""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine a result was produced on"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(path: Optional[str], name: str, results: Any) -> None:
+    """Write benchmark results as JSON when an output path is given"""
+    if not path:
+        return
+    payload = {"benchmark": name, "environment": environment(), "results": results}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {path}")
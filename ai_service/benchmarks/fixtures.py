@@ -0,0 +1,221 @@
+"""
+Generated resume and job fixtures for benchmarks.
+
+Each DOCX template mirrors a layout that is common in resume builders and
+records the marker tokens a complete extraction must recover. The corpus
+helpers render the same sample resume as text, PDF and DOCX at several sizes;
+run this module to write a corpus to disk:
+
+    python -m benchmarks.fixtures --out corpus/
+"""
+import argparse
+import json
+import os
+from io import BytesIO
+from typing import Callable, Dict, List, Tuple
+
+import fitz
+from docx import Document
+from docx.oxml import parse_xml
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+WPS_NS = "http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+
+SAMPLE_JOB_DESCRIPTION = """Senior Backend Engineer
+
+We are looking for an engineer with 5+ years experience building Python
+services. You will design REST API and GraphQL endpoints, run workloads on
+AWS with Docker and Kubernetes, and own PostgreSQL and Redis data stores.
+Experience with React, CI pipelines (Jenkins, GitHub Actions) and Agile
+teams is a plus. Bachelor's degree in Computer Science or equivalent.
+"""
+
+
+def sample_resume_text(repeat: int = 5) -> str:
+    """Plain-text resume whose experience section grows with repeat"""
+    lines = [
+        "Jane Doe",
+        "Contact: jane.doe@example.com | github.com/janedoe",
+        "",
+        "Professional Summary",
+        "Backend engineer with 6 years experience in Python, Django and AWS.",
+        "",
+        "Work Experience",
+    ]
+    for i in range(repeat):
+        lines += [
+            f"Software Engineer, Company {i} (201{i % 10} - 202{i % 10})",
+            "- Built microservices in Python and Flask deployed with Docker and Kubernetes",
+            "- Designed PostgreSQL schemas and Redis caching for a REST API serving 10k rps",
+            "- Mentored engineers and ran Scrum ceremonies in an Agile team",
+        ]
+    lines += [
+        "",
+        "Education",
+        "Bachelor of Science in Computer Science, State University",
+        "",
+        "Technical Skills",
+        "Python, JavaScript, React, SQL, Git, Jenkins, Terraform, Machine Learning",
+        "",
+        "Certifications",
+        "AWS Certified Solutions Architect",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# Experience entries per resume size; "large" is a long multi-page CV
+SIZES = {"small": 3, "medium": 20, "large": 100}
+
+JOB_RESPONSIBILITIES = [
+    "Own the design and delivery of backend services in Python and Go.",
+    "Operate production workloads on AWS using Docker, Kubernetes and Terraform.",
+    "Build data pipelines with PostgreSQL, Redis and Elasticsearch.",
+    "Partner with product and design in an Agile, Scrum-based team.",
+    "Review code, mentor engineers and improve CI with Jenkins and GitHub Actions.",
+]
+
+
+def job_description(size: str = "small") -> str:
+    """Sample job description; larger sizes repeat the responsibilities list"""
+    repeat = {"small": 1, "medium": 4, "large": 16}[size]
+    lines = [SAMPLE_JOB_DESCRIPTION, "Responsibilities:"]
+    for i in range(repeat):
+        lines += [f"- {line}" for line in JOB_RESPONSIBILITIES]
+    return "\n".join(lines) + "\n"
+
+
+def pdf_from_text(text: str, lines_per_page: int = 50) -> bytes:
+    """Render text into a simple multi-page PDF"""
+    doc = fitz.open()
+    lines = text.splitlines()
+    for start in range(0, max(len(lines), 1), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((50, 60), "\n".join(lines[start:start + lines_per_page]), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def docx_from_text(text: str) -> bytes:
+    """Write each line of text as a DOCX paragraph"""
+    doc = Document()
+    for line in text.splitlines():
+        doc.add_paragraph(line)
+    return _save(doc)
+
+
+def resume_corpus(sizes: Dict[str, int] = SIZES) -> Dict[str, Dict[str, bytes]]:
+    """Sample resume rendered as txt/pdf/docx for each size"""
+    corpus = {}
+    for size, repeat in sizes.items():
+        text = sample_resume_text(repeat)
+        corpus[size] = {
+            "txt": text.encode("utf-8"),
+            "pdf": pdf_from_text(text),
+            "docx": docx_from_text(text),
+        }
+    return corpus
+
+
+def write_corpus(path: str, sizes: Dict[str, int] = SIZES) -> None:
+    """Write resumes as files and job descriptions as JSONL under path"""
+    resume_dir = os.path.join(path, "resumes")
+    os.makedirs(resume_dir, exist_ok=True)
+    for size, files in resume_corpus(sizes).items():
+        for extension, data in files.items():
+            with open(os.path.join(resume_dir, f"resume_{size}.{extension}"), "wb") as f:
+                f.write(data)
+    with open(os.path.join(path, "jobs.jsonl"), "w", encoding="utf-8") as f:
+        for size in ("small", "medium", "large"):
+            f.write(json.dumps({"id": f"job_{size}", "description": job_description(size)}) + "\n")
+
+
+# (docx bytes, tokens that should appear in the extracted text)
+DocxFixture = Tuple[bytes, List[str]]
+
+
+def _save(doc) -> bytes:
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _experience(doc, repeat: int) -> List[str]:
+    tokens = []
+    doc.add_heading("Work Experience", level=1)
+    for i in range(repeat):
+        token = f"ROLE{i:04d}"
+        tokens.append(token)
+        doc.add_paragraph(f"{token} Senior Engineer at Company {i}, built Python and Docker services")
+        doc.add_paragraph("Led migration to Kubernetes and AWS", style="List Bullet")
+    return tokens
+
+
+def plain_template(repeat: int = 5) -> DocxFixture:
+    """Single-column resume made only of body paragraphs"""
+    doc = Document()
+    doc.add_paragraph("PLAINNAME Jane Doe - jane@example.com")
+    tokens = ["PLAINNAME"] + _experience(doc, repeat)
+    return _save(doc), tokens
+
+
+def table_template(repeat: int = 5) -> DocxFixture:
+    """Two-column layout where the skills and education live in a table"""
+    doc = Document()
+    doc.add_paragraph("TABLENAME John Smith")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Skills"
+    table.cell(0, 1).text = "CELLSKILLS Python, React, PostgreSQL"
+    table.cell(1, 0).text = "Education"
+    table.cell(1, 1).text = "CELLEDU Bachelor of Science, State University"
+    tokens = ["TABLENAME", "CELLSKILLS", "CELLEDU"] + _experience(doc, repeat)
+    return _save(doc), tokens
+
+
+def header_template(repeat: int = 5) -> DocxFixture:
+    """Contact details in the page header and links in the footer"""
+    doc = Document()
+    section = doc.sections[0]
+    section.header.paragraphs[0].text = "HEADERCONTACT alex@example.com | +1 555 0100"
+    section.footer.paragraphs[0].text = "FOOTERLINKS github.com/alex"
+    doc.add_paragraph("BODYSUMMARY Backend engineer")
+    tokens = ["HEADERCONTACT", "FOOTERLINKS", "BODYSUMMARY"] + _experience(doc, repeat)
+    return _save(doc), tokens
+
+
+def text_box_template(repeat: int = 5) -> DocxFixture:
+    """Sidebar text box, written as a DrawingML choice with a VML fallback"""
+    doc = Document()
+    doc.add_paragraph("BOXNAME Sam Lee")
+    content = (
+        f'<w:txbxContent xmlns:w="{W_NS}"><w:p><w:r><w:t>SIDEBARSKILLS Go, Terraform</w:t></w:r></w:p>'
+        f'<w:p><w:r><w:t>SIDEBARLANGS English, Spanish</w:t></w:r></w:p></w:txbxContent>'
+    )
+    run = doc.add_paragraph().add_run()
+    run._r.append(parse_xml(
+        f'<mc:AlternateContent xmlns:mc="{MC_NS}" xmlns:w="{W_NS}" xmlns:wps="{WPS_NS}">'
+        f'<mc:Choice Requires="wps"><w:drawing><wps:txbx>{content}</wps:txbx></w:drawing></mc:Choice>'
+        f'<mc:Fallback><w:pict>{content}</w:pict></mc:Fallback></mc:AlternateContent>'
+    ))
+    tokens = ["BOXNAME", "SIDEBARSKILLS", "SIDEBARLANGS"] + _experience(doc, repeat)
+    return _save(doc), tokens
+
+
+DOCX_TEMPLATES: Dict[str, Callable[[int], DocxFixture]] = {
+    "plain": plain_template,
+    "table": table_template,
+    "header_footer": header_template,
+    "text_box": text_box_template,
+}
+
+
+def docx_fixtures(repeat: int = 5) -> Dict[str, DocxFixture]:
+    """Build every DOCX template with the given amount of experience entries"""
+    return {name: build(repeat) for name, build in DOCX_TEMPLATES.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the benchmark fixture corpus to disk")
+    parser.add_argument("--out", required=True, help="Output directory")
+    write_corpus(parser.parse_args().out)
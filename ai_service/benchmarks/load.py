@@ -0,0 +1,72 @@
+"""
+Closed-loop load generator for the HTTP endpoints.
+
+``concurrency`` virtual clients each send their next request as soon as the
+previous one finishes. Requests go to the FastAPI app in-process through
+httpx's ASGI transport, or to a running server when a base URL is given.
+"""
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+# Builds the keyword arguments for one httpx request (method, url, json, files...)
+RequestFactory = Callable[[int], Dict[str, Any]]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of a list, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, concurrency: int) -> Dict[str, Any]:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+    }
+
+
+async def run_load(make_request: RequestFactory, total: int, concurrency: int,
+                   app: Any = None, base_url: Optional[str] = None, timeout: float = 120.0) -> Dict[str, Any]:
+    """Send total requests with the given concurrency and report latency percentiles"""
+    if (app is None) == (base_url is None):
+        raise ValueError("Pass exactly one of app or base_url")
+    transport = httpx.ASGITransport(app=app) if app is not None else None
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url or "http://benchmark",
+                                 timeout=timeout) as client:
+        async def worker() -> None:
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                try:
+                    response = await client.request(**make_request(i))
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return summarize(latencies, errors, elapsed, concurrency)
@@ -0,0 +1,172 @@
+"""
+End-to-end benchmark and regression suite for the AI service hot paths.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline baseline.json --threshold 0.2
+
+Micro-benchmarks time the extraction and scoring functions on the generated
+fixture corpus at each size; the load section drives /analyze and
+/process-document in-process. With --baseline the run is compared metric by
+metric and the exit status is 1 when anything is worse than the threshold.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from benchmarks.common import environment, measure
+from benchmarks.fixtures import SIZES, job_description, resume_corpus
+from benchmarks.load import percentile, run_load
+
+# Metrics compared against a baseline, per section: name -> True when larger is better.
+# Micro-benchmark tails are too noisy at a few runs, so only their medians count.
+COMPARED_METRICS = {
+    "micro": {"median_s": False},
+    "load": {"p95_s": False, "throughput_rps": True},
+}
+
+
+def micro_benchmarks(corpus: Dict[str, Dict[str, bytes]]) -> Dict[str, Callable[[], Any]]:
+    from main import (calculate_experience_match, extract_resume_sections,
+                      extract_skills, extract_text_from_docx, extract_text_from_pdf)
+    from utils import calculate_semantic_similarity
+
+    job = job_description("medium")
+    cases: Dict[str, Callable[[], Any]] = {}
+    for size, files in corpus.items():
+        text = files["txt"].decode("utf-8")
+        cases[f"extract_skills[{size}]"] = lambda text=text: extract_skills(text)
+        cases[f"extract_resume_sections[{size}]"] = lambda text=text: extract_resume_sections(text)
+        cases[f"calculate_experience_match[{size}]"] = lambda text=text: calculate_experience_match(text, job)
+        cases[f"calculate_semantic_similarity[{size}]"] = lambda text=text: calculate_semantic_similarity(text, job)
+        cases[f"extract_text_from_pdf[{size}]"] = lambda data=files["pdf"]: extract_text_from_pdf(data)
+        cases[f"extract_text_from_docx[{size}]"] = lambda data=files["docx"]: extract_text_from_docx(data)
+    return cases
+
+
+def clear_caches() -> None:
+    """Drop cached embeddings so every timed run pays for its encodes"""
+    import skill_normalizer
+    import utils
+
+    with utils._embedding_cache_lock:
+        utils._embedding_cache.clear()
+    normalizer = skill_normalizer._normalizer
+    if normalizer is not None:
+        with normalizer._lock:
+            normalizer._cache.clear()
+
+
+def run_micro(corpus: Dict[str, Dict[str, bytes]], runs: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, func in micro_benchmarks(corpus).items():
+        timings = measure(func, repeat=runs, setup=clear_caches)
+        results[name] = {"runs": runs, "median_s": float(np.median(timings)), "p95_s": percentile(timings, 95)}
+        print(f"  {name:<44} median {results[name]['median_s'] * 1000:9.3f} ms", file=sys.stderr)
+    return results
+
+
+def run_endpoints(corpus: Dict[str, Dict[str, bytes]], total: int, concurrency: int) -> Dict[str, Dict[str, Any]]:
+    from main import app
+
+    resume = corpus["medium"]
+    resume_text, job = resume["txt"].decode("utf-8"), job_description("medium")
+    # A distinct pair per request, so the embedding cache cannot answer repeats
+    endpoints = {
+        "/analyze": lambda i: {"method": "POST", "url": "/analyze", "json": {
+            "resume_text": f"{resume_text}\nReference {i}", "job_description": f"{job}\nPosting {i}",
+            "resume_data": {},
+        }},
+        "/process-document": lambda i: {
+            "method": "POST", "url": "/process-document",
+            "files": {"file": (f"resume_{i}.pdf", resume["pdf"], "application/pdf")},
+        },
+    }
+    results = {}
+    for name, make_request in endpoints.items():
+        results[name] = asyncio.run(run_load(make_request, total, concurrency, app=app))
+        stats = results[name]
+        print(f"  {name:<20} {stats['throughput_rps']:8.1f} req/s  p50 {stats['p50_s'] * 1000:8.1f} ms  "
+              f"p95 {stats['p95_s'] * 1000:8.1f} ms  p99 {stats['p99_s'] * 1000:8.1f} ms  "
+              f"errors {stats['errors']}", file=sys.stderr)
+    return results
+
+
+def flatten(results: Dict[str, Any]) -> Dict[str, float]:
+    """Comparable metrics as 'section.name.metric' -> value"""
+    metrics = {}
+    for section, compared in COMPARED_METRICS.items():
+        for name, stats in results.get(section, {}).items():
+            for metric in compared:
+                if metric in stats:
+                    metrics[f"{section}.{name}.{metric}"] = float(stats[metric])
+    return metrics
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Tuple[str, float, float, float]]:
+    """Return (metric, baseline, current, relative change) for every regression"""
+    base_metrics, current_metrics = flatten(baseline), flatten(current)
+    regressions = []
+    for key, base_value in base_metrics.items():
+        if key not in current_metrics or base_value <= 0:
+            continue
+        value = current_metrics[key]
+        section, metric = key.split(".", 1)[0], key.rsplit(".", 1)[1]
+        higher_is_better = COMPARED_METRICS[section][metric]
+        change = (base_value - value) / base_value if higher_is_better else (value - base_value) / base_value
+        if change > threshold:
+            regressions.append((key, base_value, value, change))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--runs", type=int, default=10, help="Runs per micro-benchmark")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    corpus = resume_corpus({size: SIZES[size] for size in args.sizes})
+    results: Dict[str, Any] = {"environment": environment()}
+
+    # The service logs heavily to stdout; keep it out of the report
+    with tempfile.TemporaryDirectory() as store_dir, contextlib.redirect_stdout(io.StringIO()):
+        os.environ["RESUME_STORE_DIR"] = store_dir
+        print("micro-benchmarks:", file=sys.stderr)
+        results["micro"] = run_micro(corpus, args.runs)
+        if not args.skip_load:
+            print("endpoints:", file=sys.stderr)
+            results["load"] = run_endpoints(corpus, args.requests, args.concurrency)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        for key, base_value, value, change in regressions:
+            print(f"REGRESSION {key}: {base_value:.6g} -> {value:.6g} ({change:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Append-only columnar store backed by memory-mapped numpy files.
+
+Each column lives in its own file, so a scoring path reads only the columns
+it needs and never deserializes whole records:
+
+    fixed   {name}.col              width values of dtype per row
+    str     {name}.data {name}.ends UTF-8 bytes, int64 end offset per row
+    json    {name}.data {name}.ends JSON text, int64 end offset per row
+    list    {name}.data {name}.ends flat values of dtype, int64 end per row
+
+Readers memory-map the files read-only, so column access is zero-copy and
+pages are shared between processes opening the same store. Appends take a
+file lock, write every column and finish by appending to ``rows.commit``;
+its length is the committed row count, so bytes left past it by an
+interrupted append are ignored by readers and truncated by the next writer.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+
+    def _lock_file(f: Any) -> None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+    def _unlock_file(f: Any) -> None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+except ImportError:  # Windows: single-process serving only; append() holds the thread lock
+    def _lock_file(f: Any) -> None:
+        pass
+
+    def _unlock_file(f: Any) -> None:
+        pass
+
+COLUMN_KINDS = ("fixed", "str", "json", "list")
+FORMAT = "columnar-1"
+
+
+class Column:
+    """Name, kind and element type of one column"""
+
+    def __init__(self, name: str, kind: str, dtype: str = "uint8", width: int = 1):
+        if kind not in COLUMN_KINDS:
+            raise ValueError(f"Unknown column kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.dtype = np.dtype(dtype if kind in ("fixed", "list") else "uint8")
+        self.width = width
+
+    @property
+    def variable(self) -> bool:
+        return self.kind != "fixed"
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "kind": self.kind, "dtype": self.dtype.str, "width": self.width}
+
+    def encode(self, value: Any) -> np.ndarray:
+        """Values of one row as a flat array of the column's dtype"""
+        if self.kind == "fixed":
+            if value is None:
+                return np.zeros(self.width, dtype=self.dtype)
+            return np.asarray(value, dtype=self.dtype).reshape(self.width)
+        if self.kind == "list":
+            return np.asarray(value if value is not None else [], dtype=self.dtype).reshape(-1)
+        text = value if self.kind == "str" else json.dumps(value)
+        return np.frombuffer((text or "").encode("utf-8"), dtype=np.uint8)
+
+    def decode(self, values: np.ndarray) -> Any:
+        if self.kind == "fixed":
+            return values[0].item() if self.width == 1 else np.array(values)
+        if self.kind == "list":
+            return values.tolist()
+        text = values.tobytes().decode("utf-8")
+        return text if self.kind == "str" else json.loads(text)
+
+
+def _map(path: str, dtype: np.dtype, count: int) -> np.ndarray:
+    """Read-only memory map of the first count items of a file"""
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+class ColumnarStore:
+    """Append-only table of typed columns, read through memory maps.
+
+    Several processes may append to one directory; each picks up rows
+    committed by the others the next time it reads.
+    """
+
+    def __init__(self, path: str, columns: List[Column], meta: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.columns = {column.name: column for column in columns}
+        self._lock = threading.Lock()
+        self._rows = 0
+        self._maps: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]] = {}
+        os.makedirs(path, exist_ok=True)
+        self._check_meta(meta or {})
+        self._sync()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _check_meta(self, meta: Dict[str, Any]) -> None:
+        expected = {"format": FORMAT, "columns": [c.describe() for c in self.columns.values()], **meta}
+        meta_path = self._file("meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored != expected:
+                raise ValueError(f"Store at {self.path} was written with a different layout")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(expected, f)
+
+    def _committed(self) -> int:
+        try:
+            return os.path.getsize(self._file("rows.commit")) // 8
+        except FileNotFoundError:
+            return 0
+
+    def _sync(self) -> Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Remap the columns if rows were committed since the last read"""
+        with self._lock:
+            rows = self._committed()
+            if rows == self._rows and self._maps:
+                return self._maps
+            maps = {}
+            for column in self.columns.values():
+                if column.variable:
+                    ends = _map(self._file(column.name + ".ends"), np.dtype(np.int64), rows)
+                    data = _map(self._file(column.name + ".data"), column.dtype, int(ends[-1]) if rows else 0)
+                    maps[column.name] = (data, ends)
+                else:
+                    data = _map(self._file(column.name + ".col"), column.dtype, rows * column.width)
+                    maps[column.name] = (data.reshape(rows, column.width), None)
+            self._maps, self._rows = maps, rows
+            return maps
+
+    def __len__(self) -> int:
+        return self._committed()
+
+    def scan(self, *names: str) -> List[Any]:
+        """Memory-mapped columns from one consistent snapshot.
+
+        Fixed columns come back as (rows,) or (rows, width) arrays, variable
+        ones as (flat values, per-row end offsets).
+        """
+        maps = self._sync()
+        result = []
+        for name in names:
+            data, ends = maps[name]
+            if ends is not None:
+                result.append((data, ends))
+            else:
+                result.append(data[:, 0] if self.columns[name].width == 1 else data)
+        return result
+
+    def column(self, name: str) -> np.ndarray:
+        """Memory-mapped values of a fixed column: (rows,) or (rows, width)"""
+        if self.columns[name].variable:
+            raise TypeError(f"Column {name} has variable-length rows; use values()")
+        return self.scan(name)[0]
+
+    def values(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Flat memory-mapped values and per-row end offsets of a variable column"""
+        if not self.columns[name].variable:
+            raise TypeError(f"Column {name} has fixed-width rows; use column()")
+        return self.scan(name)[0]
+
+    def get(self, name: str, row: int) -> Any:
+        """Decoded value of one column for one row"""
+        return self.row(row, [name])[name]
+
+    def row(self, row: int, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Decoded values of one row, for the given columns or all of them"""
+        maps = self._sync()
+        if not 0 <= row < self._rows_in(maps):
+            raise KeyError(row)
+        record = {}
+        for name in names or self.columns:
+            data, ends = maps[name]
+            if ends is None:
+                record[name] = self.columns[name].decode(data[row])
+            else:
+                start = int(ends[row - 1]) if row else 0
+                record[name] = self.columns[name].decode(data[start:int(ends[row])])
+        return record
+
+    def _rows_in(self, maps: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]) -> int:
+        data, ends = next(iter(maps.values()))
+        return len(ends) if ends is not None else len(data)
+
+    def _truncate_partial_rows(self, rows: int) -> Dict[str, int]:
+        """Drop bytes left by an interrupted append; returns each variable column's end"""
+        ends: Dict[str, int] = {}
+        for column in self.columns.values():
+            if column.variable:
+                data_end = 0
+                ends_path = self._file(column.name + ".ends")
+                if rows:
+                    with open(ends_path, "rb") as f:
+                        f.seek((rows - 1) * 8)
+                        data_end = int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+                ends[column.name] = data_end
+                files = ((ends_path, rows * 8), (self._file(column.name + ".data"), data_end * column.dtype.itemsize))
+            else:
+                files = ((self._file(column.name + ".col"), rows * column.width * column.dtype.itemsize),)
+            for path, size in files:
+                if os.path.exists(path) and os.path.getsize(path) > size:
+                    os.truncate(path, size)
+        return ends
+
+    def append(self, rows: List[Dict[str, Any]]) -> int:
+        """Append rows (dicts of column values; missing ones are empty) and return the first row id"""
+        # The thread lock serializes appends within a process (the only guard
+        # where fcntl is missing), the file lock across processes
+        with self._lock, open(self._file("append.lock"), "wb") as lock_file:
+            _lock_file(lock_file)
+            try:
+                first = self._committed()
+                ends = self._truncate_partial_rows(first)
+                for column in self.columns.values():
+                    encoded = [column.encode(row.get(column.name)) for row in rows]
+                    suffix = ".data" if column.variable else ".col"
+                    with open(self._file(column.name + suffix), "ab") as f:
+                        f.write(b"".join(values.tobytes() for values in encoded))
+                    if column.variable:
+                        offsets = ends[column.name] + np.cumsum([len(values) for values in encoded], dtype=np.int64)
+                        with open(self._file(column.name + ".ends"), "ab") as f:
+                            f.write(offsets.astype(np.int64).tobytes())
+                # Committing the rows is the last write
+                with open(self._file("rows.commit"), "ab") as f:
+                    f.write(np.arange(first, first + len(rows), dtype=np.int64).tobytes())
+            finally:
+                _unlock_file(lock_file)
+        return first
+
+
+def row_ids(ends: np.ndarray) -> np.ndarray:
+    """Row id of every flat value of a variable column, for vectorized scans"""
+    counts = np.diff(np.concatenate([[0], ends]))
+    return np.repeat(np.arange(len(ends)), counts)
@@ -0,0 +1,143 @@
+"""
+Per-request latency budgets for the analysis stages.
+
+A ``Deadline`` is created for each ``/analyze`` request from the
+``X-Deadline-Ms`` header or the ``ANALYZE_DEADLINE_MS`` setting, and is passed
+down through the stages. Its budget counts from the arrival time that
+``ArrivalTimeMiddleware`` records before admission control, so time spent
+queued for a slot is part of it. Before an expensive step (a transformer encode, a
+TF-IDF fit) the stage asks ``deadline.allows(step, units)``, which compares
+the remaining budget with a running estimate of that step's cost. When the
+budget is too small the stage uses a cheaper fallback and records it with
+``deadline.degrade``; the recorded fallbacks are returned to the client in
+the response's ``degraded`` field and counted in ``analysis_degraded_total``.
+
+A degraded step is not timed, so the cost model would otherwise never see it
+get faster again. Learned costs therefore relax back towards the default guess
+with a half-life of ``COST_HALF_LIFE_S``; once the estimate fits the budget
+the step runs, and its timing is learned afresh.
+"""
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from fastapi import HTTPException, Request
+
+from metrics import Counter
+
+DEGRADED = Counter("analysis_degraded_total", "Analysis components computed with a fallback to meet a deadline",
+                   ("component", "fallback"))
+
+DEADLINE_HEADER = "x-deadline-ms"
+
+# Initial cost guesses in seconds per unit, refined from observed timings
+DEFAULT_COSTS = {
+    "encode": 0.05,  # per text passed to the sentence transformer
+    "encode_phrase": 0.002,  # per skill n-gram passed to the sentence transformer
+    "tfidf": 0.002,  # per 1000 characters of resume + job text
+}
+# Seconds for a learned cost's distance from its default guess to halve
+COST_HALF_LIFE_S = 60.0
+
+
+class CostModel:
+    """Exponentially weighted per-unit cost of each expensive step, decaying towards its default"""
+
+    def __init__(self, defaults: Mapping[str, float] = DEFAULT_COSTS, alpha: float = 0.2,
+                 half_life_s: float = COST_HALF_LIFE_S, clock: Callable[[], float] = time.monotonic):
+        self.defaults = dict(defaults)
+        self.costs = dict(defaults)
+        self.alpha = alpha
+        self.half_life_s = half_life_s
+        self.clock = clock
+        self._observed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def cost(self, step: str) -> float:
+        """Current per-unit estimate: the learned cost, pulled back towards the default as it ages"""
+        with self._lock:
+            return self._cost(step)
+
+    def _cost(self, step: str) -> float:
+        default = self.defaults.get(step, 0.0)
+        observed_at = self._observed_at.get(step)
+        if observed_at is None:
+            return default
+        weight = 0.5 ** ((self.clock() - observed_at) / self.half_life_s)
+        return default + (self.costs[step] - default) * weight
+
+    def estimate(self, step: str, units: float = 1.0) -> float:
+        return self.cost(step) * units
+
+    def observe(self, step: str, seconds: float, units: float = 1.0) -> None:
+        if units <= 0:
+            return
+        with self._lock:
+            # Blended into the current estimate, so one slow sample only moves it part way
+            self.costs[step] = (1 - self.alpha) * self._cost(step) + self.alpha * seconds / units
+            self._observed_at[step] = self.clock()
+
+
+costs = CostModel()
+
+
+class Deadline:
+    """Time budget of one request and the fallbacks taken to stay within it"""
+
+    def __init__(self, budget_s: float, cost_model: Optional[CostModel] = None, start: Optional[float] = None):
+        self.budget_s = budget_s
+        self.expires = (time.perf_counter() if start is None else start) + budget_s
+        self.cost_model = cost_model or costs
+        self.degraded: Dict[str, str] = {}
+
+    def remaining(self) -> float:
+        return self.expires - time.perf_counter()
+
+    def allows(self, step: str, units: float = 1.0) -> bool:
+        """Whether the step is expected to finish before the deadline"""
+        return self.cost_model.estimate(step, units) <= self.remaining()
+
+    def degrade(self, component: str, fallback: str) -> None:
+        self.degraded[component] = fallback
+        DEGRADED.inc(component=component, fallback=fallback)
+
+
+def allows(deadline: Optional[Deadline], step: str, units: float = 1.0) -> bool:
+    return deadline is None or deadline.allows(step, units)
+
+
+def observe(step: str, start: float, units: float = 1.0) -> None:
+    """Record how long a step that started at perf_counter() value start took"""
+    costs.observe(step, time.perf_counter() - start, units)
+
+
+class ArrivalTimeMiddleware:
+    """ASGI middleware recording when a request arrived, as request.state.arrived_at"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["arrived_at"] = time.perf_counter()
+        await self.app(scope, receive, send)
+
+
+def request_deadline(request: Request) -> Optional[Deadline]:
+    """Deadline from the X-Deadline-Ms header, else ANALYZE_DEADLINE_MS, else None.
+
+    The budget counts from the request's arrival when ArrivalTimeMiddleware
+    recorded it, otherwise from now.
+    """
+    value = request.headers.get(DEADLINE_HEADER) or os.environ.get("ANALYZE_DEADLINE_MS")
+    if not value:
+        return None
+    try:
+        budget_ms = float(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {DEADLINE_HEADER} value: {value}")
+    if not math.isfinite(budget_ms) or budget_ms <= 0:
+        raise HTTPException(status_code=400, detail=f"{DEADLINE_HEADER} must be a positive number")
+    return Deadline(budget_ms / 1000, start=getattr(request.state, "arrived_at", None))
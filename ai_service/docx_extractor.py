@@ -0,0 +1,102 @@
+"""
+Streaming DOCX text extraction straight from the OOXML parts.
+
+A DOCX file is a zip archive; the body lives in ``word/document.xml`` and
+page headers/footers in ``word/header*.xml`` / ``word/footer*.xml``. Instead
+of building the python-docx object model we iter-parse those parts and emit
+one line per paragraph in document order. Because every ``w:p`` is visited,
+this also picks up table cells and text boxes, which ``Document.paragraphs``
+skips. Every element outside a paragraph - emitted paragraphs, tables, rows,
+cells - is detached from its parent as soon as it ends, so memory stays
+bounded by the largest paragraph rather than the document.
+"""
+import io
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import IO, Iterator, List
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+
+PARAGRAPH = f"{{{W_NS}}}p"
+TEXT = f"{{{W_NS}}}t"
+TAB = f"{{{W_NS}}}tab"
+# Paragraph properties hold tab-stop definitions (w:tabs/w:tab), not text
+PARAGRAPH_PROPERTIES = f"{{{W_NS}}}pPr"
+BREAKS = {f"{{{W_NS}}}br", f"{{{W_NS}}}cr"}
+# Text boxes are written twice: a DrawingML choice and a VML fallback
+FALLBACK = f"{{{MC_NS}}}Fallback"
+
+_PART_NUMBER = re.compile(r"(\d+)\.xml$")
+
+
+def _numbered_parts(names: List[str], prefix: str) -> List[str]:
+    parts = [n for n in names if n.startswith(prefix) and n.endswith(".xml")]
+    return sorted(parts, key=lambda n: int(m.group(1)) if (m := _PART_NUMBER.search(n)) else 0)
+
+
+def document_parts(archive: zipfile.ZipFile) -> List[str]:
+    """Text-bearing parts in reading order: headers, body, footers"""
+    names = archive.namelist()
+    if "word/document.xml" not in names:
+        raise KeyError("word/document.xml")
+    return _numbered_parts(names, "word/header") + ["word/document.xml"] + _numbered_parts(names, "word/footer")
+
+
+def iter_part_paragraphs(stream: IO[bytes]) -> Iterator[str]:
+    """Yield the text of each paragraph in one WordprocessingML part"""
+    buffers: List[List[str]] = []
+    open_elements: List[ET.Element] = []
+    skip_depth = 0
+    properties_depth = 0
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            open_elements.append(elem)
+            if tag == FALLBACK:
+                skip_depth += 1
+            elif tag == PARAGRAPH_PROPERTIES:
+                properties_depth += 1
+            elif tag == PARAGRAPH and not skip_depth:
+                buffers.append([])
+            continue
+
+        open_elements.pop()
+        if tag == FALLBACK:
+            skip_depth -= 1
+        elif tag == PARAGRAPH_PROPERTIES:
+            properties_depth -= 1
+        elif skip_depth:
+            pass
+        elif tag == TEXT:
+            if buffers and elem.text:
+                buffers[-1].append(elem.text)
+        elif tag == TAB:
+            if buffers and not properties_depth:
+                buffers[-1].append("\t")
+        elif tag in BREAKS:
+            if buffers:
+                buffers[-1].append("\n")
+        elif tag == PARAGRAPH and buffers:
+            # Text-box paragraphs nest inside an outer paragraph and end first
+            yield "".join(buffers.pop())
+
+        # Outside a paragraph nothing finished is needed again; a parent only
+        # ever holds its one just-ended child, so the removal is cheap
+        if not buffers and open_elements:
+            open_elements[-1].remove(elem)
+
+
+def iter_docx_paragraphs(content: bytes) -> Iterator[str]:
+    """Yield paragraphs, table cells and text boxes of a DOCX file in order"""
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        for part in document_parts(archive):
+            with archive.open(part) as stream:
+                yield from iter_part_paragraphs(stream)
+
+
+def extract_docx_text(content: bytes) -> str:
+    """Extract DOCX text with one line per paragraph"""
+    return "".join(paragraph + "\n" for paragraph in iter_docx_paragraphs(content))
@@ -9,6 +9,7 @@ import re
 
 # Import functions from utils.py
 from utils import extract_skills, calculate_semantic_similarity
+from profiling import thread_profiled
 
 router = APIRouter()
 
@@ -36,7 +37,8 @@ class JobRecommendationResponse(BaseModel):
     recommendations: List[JobListing]
 
 @router.post("/job-recommendations", response_model=JobRecommendationResponse)
-async def get_job_recommendations(request: JobRecommendationRequest):
+@thread_profiled
+def get_job_recommendations(request: JobRecommendationRequest):
     try:
         # Extract skills from resume
         resume_skills = extract_skills(request.resumeText)
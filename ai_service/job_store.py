@@ -0,0 +1,84 @@
+"""
+Persisted store of parsed job descriptions.
+
+Jobs fetched by ``/scrape-job`` are appended with their parsed requirements,
+skill IDs and embedding as columns of a memory-mapped ``ColumnarStore``, so
+batch scoring (``all_pairs.py``) can reuse them without re-parsing.
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from columnar_store import Column, ColumnarStore
+from resume_store import EMBEDDING_DIM, skill_id_list
+from utils import SKILL_VOCABULARY
+
+DEFAULT_JOB_STORE_DIR = os.path.join("data", "job_store")
+
+
+def job_columns(dim: int) -> List[Column]:
+    return [
+        Column("embedding", "fixed", "float32", dim),
+        Column("skill_ids", "list", "int32"),
+        Column("url", "str"),
+        Column("description", "str"),
+        Column("requirements", "json"),
+    ]
+
+
+class JobStore:
+    """Append-only on-disk store of parsed jobs"""
+
+    def __init__(self, path: str, dim: int = EMBEDDING_DIM):
+        self.path = path
+        self.dim = dim
+        self.table = ColumnarStore(path, job_columns(dim), {"vocabulary": SKILL_VOCABULARY})
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def add(self, description: str, requirements: Dict[str, Any], skills: List[str], url: str = "",
+            embedding: Optional[np.ndarray] = None) -> int:
+        """Append a parsed job and return its id"""
+        return self.table.append([{
+            "embedding": embedding,
+            "skill_ids": skill_id_list(skills),
+            "url": url,
+            "description": description,
+            "requirements": requirements,
+        }])
+
+    def get(self, job_id: int) -> Dict[str, Any]:
+        """Read one stored job"""
+        record = self.table.row(job_id, ["url", "description", "requirements", "skill_ids"])
+        record["skills"] = [SKILL_VOCABULARY[i] for i in record.pop("skill_ids")]
+        return {"id": job_id, **record}
+
+    def prepared_jobs(self) -> List[Dict[str, Any]]:
+        """Every job with its skills and embedding (None when stored without one)"""
+        embeddings, (skill_values, skill_ends), (text, text_ends) = self.table.scan("embedding", "skill_ids", "description")
+        jobs = []
+        skill_start = text_start = 0
+        for job_id, embedding in enumerate(embeddings):
+            skill_end, text_end = int(skill_ends[job_id]), int(text_ends[job_id])
+            jobs.append({
+                "id": str(job_id),
+                "description": text[text_start:text_end].tobytes().decode("utf-8"),
+                "skills": [SKILL_VOCABULARY[i] for i in skill_values[skill_start:skill_end]],
+                "embedding": np.array(embedding) if embedding.any() else None,
+            })
+            skill_start, text_start = skill_end, text_end
+        return jobs
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """Shared store, located by the JOB_STORE_DIR environment variable"""
+    global _store
+    path = os.environ.get("JOB_STORE_DIR", DEFAULT_JOB_STORE_DIR)
+    if _store is None or _store.path != path:
+        _store = JobStore(path)
+    return _store
@@ -1,4 +1,6 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
@@ -9,14 +11,39 @@ import requests
 from bs4 import BeautifulSoup
 import nltk
 import io
+import math
+import time
+import zipfile
+from collections import Counter
+import xml.etree.ElementTree as ET
 from typing import List, Dict, Any, Optional, Union
 
 # Import shared functions from utils
 from utils import extract_skills, calculate_semantic_similarity
 
+# Import per-request latency budgets
+from deadlines import ArrivalTimeMiddleware, Deadline, allows, observe, request_deadline
+
+# Import streaming DOCX extractor
+from docx_extractor import extract_docx_text
+
 # Import job recommendations router
 from job_recommendations import router as job_recommendations_router
 
+# Import response serialization helpers
+from responses import ORJSONResponse, dumps, resolve_include
+
+# Import opt-in request profiling
+from profiling import install_profiling, run_in_threadpool, thread_profiled
+
+# Import admission control and metrics
+from admission import AdmissionMiddleware, admission_enabled
+from metrics import router as metrics_router
+
+# Import resume store and reverse search router
+from resume_store import router as resume_search_router, get_resume_store, embed_document
+from job_store import get_job_store
+
 # Download required NLTK data
 try:
     nltk.data.find('tokenizers/punkt')
@@ -29,8 +56,23 @@ except LookupError:
 
 app = FastAPI()
 
+# Compress large responses (full /analyze payloads carry the resume text)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Include job recommendations router
 app.include_router(job_recommendations_router)
+app.include_router(resume_search_router)
+app.include_router(metrics_router)
+
+# Request profiling is off unless PROFILING_ENABLED is set
+install_profiling(app)
+
+# Queue, prioritize and shed interactive vs bulk traffic (ADMISSION_CONTROL=0 disables)
+if admission_enabled():
+    app.add_middleware(AdmissionMiddleware)
+
+# Outermost, so request deadlines count time queued for admission
+app.add_middleware(ArrivalTimeMiddleware)
 
 
 
@@ -43,148 +85,286 @@ class DocumentAnalysisRequest(BaseModel):
     job_description: str
     resume_data: Dict[str, Any]
 
-@app.post("/analyze")
-async def analyze_match(request: AnalysisRequest):
+class ProjectSuggestion(BaseModel):
+    title: str
+    description: str
+    relevance: str
+
+class JobRequirements(BaseModel):
+    required_skills: List[str]
+    preferred_skills: List[str]
+    experience_level: str
+    education_level: str
+    responsibilities: List[str]
+
+class AnalysisResponse(BaseModel):
+    overall_score: int
+    skill_match: int
+    experience_match: int
+    keyword_density: int
+    semantic_similarity: int
+    is_complete_mismatch: bool
+    mismatch_message: Optional[str] = None
+    required_skills: List[str]
+    your_skills: List[str]
+    missing_skills: List[str]
+    matching_skills: List[str]
+    strengths: List[str]
+    improvements: List[str]
+    suggested_projects: List[ProjectSuggestion]
+    resume_sections: Dict[str, str]
+    job_requirements: JobRequirements
+    # Component -> fallback used to meet the request deadline; only set when one was
+    degraded: Optional[Dict[str, str]] = None
+
+SCORE_FIELDS = {
+    "overall_score", "skill_match", "experience_match", "keyword_density",
+    "semantic_similarity", "is_complete_mismatch", "mismatch_message", "degraded"
+}
+
+# Named projections of the /analyze response; None means every field
+ANALYSIS_VIEWS = {
+    "full": None,
+    "scores": SCORE_FIELDS,
+    "compact": SCORE_FIELDS | {
+        "matching_skills", "missing_skills", "strengths", "improvements",
+        "suggested_projects", "job_requirements"
+    },
+}
+
+# Sub-keys that can be requested individually, e.g. fields=resume_sections.skills
+ANALYSIS_NESTED_FIELDS = {
+    "resume_sections": ["contact", "summary", "experience", "education", "skills", "certifications"],
+    "job_requirements": list(JobRequirements.model_fields),
+}
+
+@app.post("/analyze", response_model=AnalysisResponse, response_model_exclude_unset=True)
+async def analyze_match(request: AnalysisRequest, http_request: Request, view: str = "full", fields: Optional[str] = None):
+    """Score a resume against a job description.
+
+    ``view`` selects a preset projection (full, scores, compact) and ``fields``
+    a comma-separated list such as ``overall_score,resume_sections.skills``.
+    An ``X-Deadline-Ms`` header (or ANALYZE_DEADLINE_MS) sets a latency budget;
+    components computed with a cheaper fallback to meet it are listed in
+    ``degraded``.
+    """
+    include = resolve_include(view, fields, ANALYSIS_VIEWS, AnalysisResponse.model_fields, ANALYSIS_NESTED_FIELDS)
+    deadline = request_deadline(http_request)
     try:
-        print("=== ANALYSIS REQUEST ===")
-        print("Resume text received:", request.resume_text[:500])
-        print("Job description received:", request.job_description[:500])
-        
-        # Extract skills from resume and job
-        print("=== RESUME TEXT DEBUG ===")
-        print("Resume text length:", len(request.resume_text))
-        print("Resume text preview:", request.resume_text[:300])
-        
-        print("=== JOB DESCRIPTION DEBUG ===")
-        print("Job description length:", len(request.job_description))
-        print("Job description preview:", request.job_description[:300])
-        
-        resume_skills = extract_skills(request.resume_text)
-        job_skills = extract_skills(request.job_description)
-        
-        # Extract additional information
-        print("=== RESUME SECTIONS DEBUG ===")
-        print("Resume text for section extraction:", request.resume_text[:500])
-        resume_sections = extract_resume_sections(request.resume_text)
-        print("Extracted sections:", resume_sections)
-        job_requirements = extract_job_requirements(request.job_description)
-        
-        print("=== SKILL EXTRACTION ===")
-        print("Skills found in resume:", resume_skills)
-        print("Skills found in job:", job_skills)
-        
-        # Calculate comprehensive scores
-        skill_match = calculate_skill_match(resume_skills, job_skills)
-        experience_match = calculate_experience_match(request.resume_text, request.job_description)
-        keyword_density = calculate_keyword_density(request.resume_text, request.job_description)
-        semantic_similarity = calculate_semantic_similarity(request.resume_text, request.job_description)
-        
-        print("=== SCORES ===")
-        print("Skill match:", skill_match)
-        print("Experience match:", experience_match)
-        print("Keyword density:", keyword_density)
-        print("Semantic similarity:", semantic_similarity)
-        
-        # Check for complete mismatch
-        is_complete_mismatch = skill_match < 0.1 and experience_match < 0.1
-        
-        # Calculate overall score with weighted components
-        overall_score = int((
-            skill_match * 0.35 + 
-            experience_match * 0.25 + 
-            keyword_density * 0.20 + 
-            semantic_similarity * 0.20
-        ) * 100)
-        
-        # Check if score is too low
-        is_low_score = overall_score < 50
-        
-        if is_complete_mismatch or is_low_score:
-            message = "This position is not suitable for your current skill set." if is_complete_mismatch else "Your skills don't align well with this position."
-            
-            missing_skills = list(set(job_skills) - set(resume_skills))
-            matching_skills = list(set(resume_skills) & set(job_skills))
-            
-            return {
-                "overall_score": overall_score,
-                "skill_match": int(skill_match * 100),
-                "experience_match": int(experience_match * 100),
-                "keyword_density": int(keyword_density * 100),
-                "semantic_similarity": int(semantic_similarity * 100),
-                "is_complete_mismatch": True,
-                "mismatch_message": message,
-                "required_skills": list(job_skills),
-                "your_skills": list(resume_skills),
-                "missing_skills": missing_skills,
-                "matching_skills": matching_skills,
-                "strengths": generate_strengths(resume_skills, job_skills, matching_skills),
-                "improvements": generate_improvements(resume_skills, job_skills, missing_skills),
-                "suggested_projects": generate_projects(job_skills, resume_skills),
-                "resume_sections": resume_sections,
-                "job_requirements": job_requirements
-            }
-        
-        # Generate comprehensive recommendations
-        matching_skills = list(set(resume_skills) & set(job_skills))
-        missing_skills = list(set(job_skills) - set(resume_skills))
-        strengths = generate_strengths(resume_skills, job_skills, matching_skills)
-        improvements = generate_improvements(resume_skills, job_skills, missing_skills)
-        projects = generate_projects(job_skills, resume_skills)
-        
-        return {
-            "overall_score": overall_score,
-            "skill_match": int(skill_match * 100),
-            "experience_match": int(experience_match * 100),
-            "keyword_density": int(keyword_density * 100),
-            "semantic_similarity": int(semantic_similarity * 100),
-            "is_complete_mismatch": False,
-            "required_skills": list(job_skills),
-            "your_skills": list(resume_skills),
-            "missing_skills": missing_skills,
-            "matching_skills": matching_skills,
-            "strengths": strengths,
-            "improvements": improvements,
-            "suggested_projects": projects,
-            "resume_sections": resume_sections,
-            "job_requirements": job_requirements
-        }
+        # CPU-bound: run off the event loop so admitted requests run concurrently
+        payload = await run_in_threadpool(build_analysis, request.resume_text, request.job_description, deadline)
+        analysis = AnalysisResponse(**payload)
     except Exception as e:
         print("=== ERROR ===")
         print("Error in analysis:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
+    
+    return ORJSONResponse(analysis.model_dump(include=include, exclude_unset=True))
+
+@app.post("/analyze/stream")
+async def analyze_match_stream(request: AnalysisRequest, http_request: Request, view: str = "full", fields: Optional[str] = None):
+    """Stream /analyze progressively: skill lists and cheap scores first, then
+    the model-based scores, then the complete result.
+
+    Sends Server-Sent Events when the client accepts ``text/event-stream`` and
+    newline-delimited JSON otherwise. Every event is ``{"event", "data"}``; the
+    final ``result`` event's data is exactly the /analyze response.
+    """
+    include = resolve_include(view, fields, ANALYSIS_VIEWS, AnalysisResponse.model_fields, ANALYSIS_NESTED_FIELDS)
+    deadline = request_deadline(http_request)
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    
+    def encode(event: str, data: Dict[str, Any]) -> bytes:
+        if use_sse:
+            return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+        return dumps({"event": event, "data": data}) + b"\n"
+    
+    async def events():
+        try:
+            quick = await run_in_threadpool(analyze_skills_stage, request.resume_text, request.job_description, deadline)
+            yield encode("skills", {
+                "required_skills": quick["job_skills"],
+                "your_skills": quick["resume_skills"],
+                "matching_skills": quick["matching_skills"],
+                "missing_skills": quick["missing_skills"],
+                "skill_match": int(quick["skill_match"] * 100),
+                "keyword_density": int(quick["keyword_density"] * 100)
+            })
+            
+            model_scores = await run_in_threadpool(analyze_model_stage, request.resume_text, request.job_description, deadline)
+            scores = {
+                "experience_match": int(model_scores["experience_match"] * 100),
+                "semantic_similarity": int(model_scores["semantic_similarity"] * 100)
+            }
+            if deadline is not None and deadline.degraded:
+                scores["degraded"] = dict(deadline.degraded)
+            yield encode("scores", scores)
+            
+            payload = await run_in_threadpool(assemble_analysis, request.resume_text, request.job_description, quick, model_scores, deadline)
+            analysis = AnalysisResponse(**payload)
+            yield encode("result", analysis.model_dump(include=include, exclude_unset=True))
+        except Exception as e:
+            print("=== ERROR ===")
+            print("Error in streaming analysis:", str(e))
+            yield encode("error", {"detail": str(e)})
+    
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+def analyze_skills_stage(resume_text: str, job_description: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Cheap first stage: skill extraction, skill match and keyword density"""
+    print("=== ANALYSIS REQUEST ===")
+    print("Resume text received:", resume_text[:500])
+    print("Job description received:", job_description[:500])
+    
+    # Extract skills from resume and job
+    print("=== RESUME TEXT DEBUG ===")
+    print("Resume text length:", len(resume_text))
+    print("Resume text preview:", resume_text[:300])
+    
+    print("=== JOB DESCRIPTION DEBUG ===")
+    print("Job description length:", len(job_description))
+    print("Job description preview:", job_description[:300])
+    
+    resume_skills = extract_skills(resume_text, deadline)
+    job_skills = extract_skills(job_description, deadline)
+    
+    print("=== SKILL EXTRACTION ===")
+    print("Skills found in resume:", resume_skills)
+    print("Skills found in job:", job_skills)
+    
+    return {
+        "resume_skills": resume_skills,
+        "job_skills": job_skills,
+        "matching_skills": list(set(resume_skills) & set(job_skills)),
+        "missing_skills": list(set(job_skills) - set(resume_skills)),
+        "skill_match": calculate_skill_match(resume_skills, job_skills),
+        "keyword_density": calculate_keyword_density(resume_text, job_description)
+    }
+
+def analyze_model_stage(resume_text: str, job_description: str, deadline: Optional[Deadline] = None) -> Dict[str, float]:
+    """Expensive second stage: TF-IDF experience match and transformer similarity"""
+    return {
+        "experience_match": calculate_experience_match(resume_text, job_description, deadline),
+        "semantic_similarity": calculate_semantic_similarity(resume_text, job_description, deadline)
+    }
+
+def assemble_analysis(resume_text: str, job_description: str, quick: Dict[str, Any], model_scores: Dict[str, float], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Final stage: overall score, sections and recommendations"""
+    resume_skills = quick["resume_skills"]
+    job_skills = quick["job_skills"]
+    matching_skills = quick["matching_skills"]
+    missing_skills = quick["missing_skills"]
+    skill_match = quick["skill_match"]
+    keyword_density = quick["keyword_density"]
+    experience_match = model_scores["experience_match"]
+    semantic_similarity = model_scores["semantic_similarity"]
+    
+    # Extract additional information
+    print("=== RESUME SECTIONS DEBUG ===")
+    print("Resume text for section extraction:", resume_text[:500])
+    resume_sections = extract_resume_sections(resume_text)
+    print("Extracted sections:", resume_sections)
+    job_requirements = extract_job_requirements(job_description)
+    
+    print("=== SCORES ===")
+    print("Skill match:", skill_match)
+    print("Experience match:", experience_match)
+    print("Keyword density:", keyword_density)
+    print("Semantic similarity:", semantic_similarity)
+    
+    # Check for complete mismatch
+    is_complete_mismatch = skill_match < 0.1 and experience_match < 0.1
+    
+    # Calculate overall score with weighted components
+    overall_score = calculate_overall_score(skill_match, experience_match, keyword_density, semantic_similarity)
+    
+    # Check if score is too low
+    is_low_score = overall_score < 50
+    
+    result = {
+        "overall_score": overall_score,
+        "skill_match": int(skill_match * 100),
+        "experience_match": int(experience_match * 100),
+        "keyword_density": int(keyword_density * 100),
+        "semantic_similarity": int(semantic_similarity * 100),
+        "is_complete_mismatch": False
+    }
+    if is_complete_mismatch or is_low_score:
+        result["is_complete_mismatch"] = True
+        result["mismatch_message"] = "This position is not suitable for your current skill set." if is_complete_mismatch else "Your skills don't align well with this position."
+    
+    # Generate comprehensive recommendations
+    result.update({
+        "required_skills": list(job_skills),
+        "your_skills": list(resume_skills),
+        "missing_skills": missing_skills,
+        "matching_skills": matching_skills,
+        "strengths": generate_strengths(resume_skills, job_skills, matching_skills),
+        "improvements": generate_improvements(resume_skills, job_skills, missing_skills),
+        "suggested_projects": generate_projects(job_skills, resume_skills),
+        "resume_sections": resume_sections,
+        "job_requirements": job_requirements
+    })
+    if deadline is not None and deadline.degraded:
+        result["degraded"] = dict(deadline.degraded)
+    return result
+
+def build_analysis(resume_text: str, job_description: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+    """Run the full resume/job analysis and return the /analyze payload"""
+    quick = analyze_skills_stage(resume_text, job_description, deadline)
+    model_scores = analyze_model_stage(resume_text, job_description, deadline)
+    return assemble_analysis(resume_text, job_description, quick, model_scores, deadline)
 
 @app.post("/process-document")
 async def process_document(file: UploadFile = File(...)):
     """Process uploaded resume document (PDF/DOCX)"""
     try:
         content = await file.read()
-        
-        if file.filename.lower().endswith('.pdf'):
-            text = extract_text_from_pdf(content)
-        elif file.filename.lower().endswith(('.docx', '.doc')):
-            text = extract_text_from_docx(content)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format")
-        
-        # Extract structured data
-        parsed_data = {
-            "text": text,
-            "sections": extract_resume_sections(text),
-            "skills": extract_skills(text),
-            "experience_years": extract_experience_years(text),
-            "education": extract_education(text)
-        }
-        
-        return {
-            "filename": file.filename,
-            "text": text,
-            "parsed_data": parsed_data
-        }
+        return await run_in_threadpool(parse_document, file.filename, content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def parse_document(filename: str, content: bytes) -> Dict[str, Any]:
+    """Extract, parse and store an uploaded resume; the /process-document payload"""
+    if filename.lower().endswith('.pdf'):
+        text = extract_text_from_pdf(content)
+    elif filename.lower().endswith(('.docx', '.doc')):
+        text = extract_text_from_docx(content)
+    else:
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    
+    # Extract structured data
+    parsed_data = {
+        "text": text,
+        "sections": extract_resume_sections(text),
+        "skills": extract_skills(text),
+        "experience_years": extract_experience_years(text),
+        "education": extract_education(text)
+    }
+    
+    # Persist for reverse search; a store failure must not fail the upload
+    resume_id = None
+    try:
+        resume_id = get_resume_store().add(
+            text, parsed_data["sections"], parsed_data["skills"],
+            filename=filename, embedding=embed_document(text),
+            experience_years=parsed_data["experience_years"],
+            education=parsed_data["education"]
+        )
+    except Exception as e:
+        print("Error storing resume:", str(e))
+    
+    return {
+        "filename": filename,
+        "resume_id": resume_id,
+        "text": text,
+        "parsed_data": parsed_data
+    }
+
 @app.post("/scrape-job")
-async def scrape_job_description(job_url: str) -> Dict[str, Any]:
+@thread_profiled
+def scrape_job_description(job_url: str) -> Dict[str, Any]:
     """Scrape job description from URL"""
     try:
         headers = {
@@ -206,11 +386,23 @@ async def scrape_job_description(job_url: str) -> Dict[str, Any]:
         lines = (line.strip() for line in text.splitlines())
         chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
         text = ' '.join(chunk for chunk in chunks if chunk)
+        requirements = extract_job_requirements(text)
+        
+        # Persist for batch scoring; a store failure must not fail the request
+        job_id = None
+        try:
+            job_id = get_job_store().add(
+                text, requirements, extract_skills(text),
+                url=job_url, embedding=embed_document(text)
+            )
+        except Exception as e:
+            print("Error storing job:", str(e))
         
         return {
             "url": job_url,
+            "job_id": job_id,
             "description": text,
-            "requirements": extract_job_requirements(text)
+            "requirements": requirements
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to scrape job description: {str(e)}")
@@ -227,7 +419,12 @@ def extract_text_from_pdf(content: bytes) -> str:
         raise Exception(f"Failed to extract text from PDF: {str(e)}")
 
 def extract_text_from_docx(content: bytes) -> str:
-    """Extract text from DOCX using python-docx"""
+    """Extract text from DOCX by streaming the XML parts, falling back to python-docx"""
+    try:
+        return extract_docx_text(content)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        print("Streaming DOCX extraction failed, falling back to python-docx:", str(e))
+    
     try:
         doc = Document(io.BytesIO(content))
         text = ""
@@ -394,19 +591,34 @@ def calculate_skill_match(resume_skills: List[str], job_skills: List[str]) -> fl
     matching_skills = set(resume_skills) & set(job_skills)
     return len(matching_skills) / len(job_skills) if job_skills else 0.0
 
-def calculate_experience_match(resume_text: str, job_description: str) -> float:
-    """Calculate experience relevance using TF-IDF"""
+def calculate_experience_match(resume_text: str, job_description: str, deadline: Optional[Deadline] = None) -> float:
+    """Calculate experience relevance using TF-IDF, or term frequencies when the deadline is too close"""
     if not resume_text or not job_description:
         return 0.0
     
+    units = (len(resume_text) + len(job_description)) / 1000
+    if not allows(deadline, "tfidf", units):
+        deadline.degrade("experience_match", "term_frequency")
+        return term_frequency_similarity(resume_text, job_description)
+    
     try:
+        start = time.perf_counter()
         vectorizer = TfidfVectorizer(stop_words='english')
         tfidf_matrix = vectorizer.fit_transform([resume_text, job_description])
         similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        observe("tfidf", start, units)
         return similarity
     except:
         return 0.0
 
+def term_frequency_similarity(resume_text: str, job_description: str) -> float:
+    """Cosine similarity of raw word counts, a cheap stand-in for the TF-IDF match"""
+    resume_counts = Counter(re.findall(r"\b\w\w+\b", resume_text.lower()))
+    job_counts = Counter(re.findall(r"\b\w\w+\b", job_description.lower()))
+    dot = sum(count * job_counts[word] for word, count in resume_counts.items())
+    norm = math.sqrt(sum(c * c for c in resume_counts.values()) * sum(c * c for c in job_counts.values()))
+    return dot / norm if norm else 0.0
+
 def calculate_keyword_density(resume_text: str, job_description: str) -> float:
     """Calculate keyword density"""
     if not resume_text or not job_description:
@@ -421,6 +633,15 @@ def calculate_keyword_density(resume_text: str, job_description: str) -> float:
     matching_words = sum(1 for word in resume_words if word in job_words)
     return min(1.0, matching_words / len(resume_words)) if resume_words else 0.0
 
+def calculate_overall_score(skill_match: float, experience_match: float, keyword_density: float, semantic_similarity: float) -> int:
+    """Weighted overall score out of 100"""
+    return int((
+        skill_match * 0.35 + 
+        experience_match * 0.25 + 
+        keyword_density * 0.20 + 
+        semantic_similarity * 0.20
+    ) * 100)
+
 def generate_strengths(resume_skills: List[str], job_skills: List[str], matching_skills: List[str]) -> List[str]:
     """Generate strengths based on matching skills"""
     strengths = []
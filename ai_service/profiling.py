@@ -0,0 +1,283 @@
+"""
+Opt-in per-request profiling.
+
+When ``PROFILING_ENABLED`` is set, a request is profiled if it carries an
+``X-Profile: 1`` header or is picked by ``PROFILE_SAMPLE_RATE`` (0.0-1.0).
+
+The handlers do their CPU work in the threadpool, so that is where the
+profilers run. The middleware puts the request's ``RequestProfile`` in a
+context variable, which anyio copies into worker threads; work started with
+``run_in_threadpool`` from this module, or wrapped in ``thread_profiled``
+(plain ``def`` handlers), registers its worker thread and runs under its own
+cProfile for the call. The per-thread results are merged into one top-N
+function summary. A sampling thread records the stacks of the event-loop
+thread and of every registered worker every few milliseconds (collapsed
+stacks, the input format of flamegraph.pl and speedscope).
+
+Profiles are kept in a bounded in-memory store and can be fetched from
+``/debug/profiles``. The response of a profiled request carries an
+``X-Profile-Id`` header. The event-loop stacks cover the whole loop, so
+concurrent requests interleaved with the profiled one show up there.
+"""
+import contextlib
+import contextvars
+import cProfile
+import functools
+import itertools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TypeVar
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool as _run_in_threadpool
+
+router = APIRouter()
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+DEFAULT_SAMPLE_INTERVAL = 0.002
+DEFAULT_TOP_N = 30
+
+
+T = TypeVar("T")
+
+
+class RequestProfile:
+    """Threads working for one profiled request and their merged cProfile stats"""
+
+    def __init__(self, loop_thread: int):
+        self.loop_thread = loop_thread
+        self.stats: Optional[pstats.Stats] = None
+        self._threads: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def thread_ids(self) -> List[int]:
+        with self._lock:
+            return [self.loop_thread, *self._threads]
+
+    @contextlib.contextmanager
+    def thread(self) -> Iterator[None]:
+        """Profile the calling worker thread for the duration of the block"""
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._threads.add(thread_id)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active cProfile; the sampler still sees this thread
+            profiler = None
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads.discard(thread_id)
+                if profiler is not None:
+                    profiler.disable()
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profiler)
+                    else:
+                        self.stats.add(profiler)
+
+
+_current: "contextvars.ContextVar[Optional[RequestProfile]]" = contextvars.ContextVar("request_profile", default=None)
+
+
+def thread_profiled(func: Callable[..., T]) -> Callable[..., T]:
+    """Profile func's calls that run for a profiled request (for sync handlers and threadpool work)"""
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        request = _current.get()
+        if request is None:
+            return func(*args, **kwargs)
+        with request.thread():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+async def run_in_threadpool(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """starlette's run_in_threadpool, profiling the call when the request is profiled"""
+    return await _run_in_threadpool(thread_profiled(func), *args, **kwargs)
+
+
+class StackSampler:
+    """Collects collapsed stacks of a changing set of threads from a background thread"""
+
+    def __init__(self, thread_ids: Callable[[], List[int]], interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids():
+                frame = frames.get(thread_id)
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if names:
+                    self.stacks[";".join(reversed(names))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def top_functions(stats: Optional[pstats.Stats], limit: int = DEFAULT_TOP_N) -> List[Dict[str, Any]]:
+    """The most expensive functions by cumulative time"""
+    if stats is None:
+        return []
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append({
+            "function": name,
+            "file": filename,
+            "line": line,
+            "calls": calls,
+            "total_s": total,
+            "cumulative_s": cumulative,
+        })
+    rows.sort(key=lambda row: row["cumulative_s"], reverse=True)
+    return rows[:limit]
+
+
+class ProfileStore:
+    """Bounded store of recent profiles, oldest evicted first"""
+
+    def __init__(self, max_profiles: int = 50):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Dict[str, Any]) -> str:
+        with self._lock:
+            profile_id = f"{int(time.time())}-{next(self._ids)}"
+            profile["id"] = profile_id
+            self._profiles[profile_id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [{k: v for k, v in p.items() if k not in ("top_functions", "collapsed")} for p in reversed(profiles)]
+
+
+store = ProfileStore(int(os.environ.get("PROFILE_STORE_SIZE", "50")))
+
+# One profiled request at a time keeps the sampled stacks attributable
+_profiler_lock = threading.Lock()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles requests selected by header or sampling"""
+
+    def __init__(self, app: Any, sample_rate: float = 0.0, profile_store: Optional[ProfileStore] = None,
+                 interval: float = DEFAULT_SAMPLE_INTERVAL, top_n: int = DEFAULT_TOP_N):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.store = profile_store
+        self.interval = interval
+        self.top_n = top_n
+
+    def _wanted(self, scope: Dict[str, Any]) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                return value not in (b"0", b"false", b"")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        if not _profiler_lock.acquire(blocking=False):
+            # Another request is already being profiled
+            await self.app(scope, receive, send)
+            return
+
+        profile_store = self.store if self.store is not None else store
+        profile: Dict[str, Any] = {"method": scope["method"], "path": scope["path"], "status": None}
+        profile_id = profile_store.add(profile)
+
+        async def send_with_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                profile["status"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        request = RequestProfile(threading.get_ident())
+        sampler = StackSampler(request.thread_ids, self.interval)
+        started = time.time()
+        start = time.perf_counter()
+        sampler.start()
+        token = _current.set(request)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
+            sampler.stop()
+            _profiler_lock.release()
+            profile.update({
+                "started_at": started,
+                "duration_s": time.perf_counter() - start,
+                "samples": sum(sampler.stacks.values()),
+                "top_functions": top_functions(request.stats, self.top_n),
+                "collapsed": sampler.collapsed(),
+            })
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+def install_profiling(app: Any) -> None:
+    """Add the middleware and debug endpoints when PROFILING_ENABLED is set"""
+    if not profiling_enabled():
+        return
+    app.add_middleware(ProfilingMiddleware, sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", "0")))
+    app.include_router(router)
+
+
+@router.get("/debug/profiles")
+async def list_profiles():
+    """Stored profiles, newest first, without their stack data"""
+    return {"profiles": store.list()}
+
+@router.get("/debug/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """One profile with its top-N summary and collapsed stacks"""
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@router.get("/debug/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+async def get_collapsed_stacks(profile_id: str):
+    """Collapsed stacks, ready for flamegraph.pl or speedscope"""
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.get("collapsed", "")
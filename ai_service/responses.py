@@ -0,0 +1,67 @@
+"""
+Response helpers: fast JSON serialization and field projection.
+"""
+import json
+from typing import Any, Dict, Iterable, Optional, Set, Union
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Nested include spec accepted by pydantic's model_dump(include=...)
+IncludeSpec = Dict[str, Union[bool, Dict[str, bool]]]
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (or the stdlib encoder as a fallback)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def parse_fields(fields: str, allowed: Iterable[str], nested: Dict[str, Iterable[str]]) -> IncludeSpec:
+    """Turn 'a,b,c.d' into a pydantic include spec, rejecting unknown names"""
+    allowed_set = set(allowed)
+    include: IncludeSpec = {}
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        field, _, key = name.partition(".")
+        if field not in allowed_set:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {field}")
+        if not key:
+            include[field] = True
+            continue
+        if field not in nested or key not in set(nested[field]):
+            raise HTTPException(status_code=400, detail=f"Unknown field: {name}")
+        current = include.get(field)
+        if current is True:
+            continue
+        sub: Dict[str, bool] = current if isinstance(current, dict) else {}
+        sub[key] = True
+        include[field] = sub
+    if not include:
+        raise HTTPException(status_code=400, detail="fields must name at least one field")
+    return include
+
+
+def resolve_include(view: str, fields: Optional[str], views: Dict[str, Optional[Set[str]]],
+                    allowed: Iterable[str], nested: Dict[str, Iterable[str]]) -> Optional[IncludeSpec]:
+    """Pick the include spec for a request: explicit fields win over a named view"""
+    if fields:
+        return parse_fields(fields, allowed, nested)
+    if view not in views:
+        raise HTTPException(status_code=400, detail=f"Unknown view: {view}. Expected one of {', '.join(views)}")
+    selected = views[view]
+    return None if selected is None else {name: True for name in selected}
@@ -0,0 +1,236 @@
+"""
+Persisted resume store and job -> resumes reverse search.
+
+Every document handled by ``/process-document`` is appended here with its
+parsed fields, skill IDs and embedding, as columns of a memory-mapped
+``ColumnarStore``:
+
+    embedding         one L2-normalized float32 row per resume (zeros if no model)
+    skill_bits        one packed bitset row per resume over SKILL_VOCABULARY
+    experience_years  int32
+    skill_ids         SKILL_VOCABULARY indices of the extracted skills
+    filename, text    strings
+    sections, education  JSON
+
+Ranking a job description is then one matrix-vector product for semantic
+similarity, a handful of column tests on the packed skill bits and an
+``argpartition`` for the top-K - no per-resume Python work, and no record
+is decoded until it is displayed.
+"""
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from columnar_store import Column, ColumnarStore
+from profiling import thread_profiled
+from utils import SKILL_INDEX, SKILL_VOCABULARY, encode_texts, extract_skills, model
+
+router = APIRouter()
+
+DEFAULT_STORE_DIR = os.path.join("data", "resume_store")
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+
+# Relative weight of the two signals, mirroring skill_match (0.35) and
+# semantic_similarity (0.20) in the overall /analyze score
+SKILL_WEIGHT = 0.35 / 0.55
+SEMANTIC_WEIGHT = 0.20 / 0.55
+
+
+# Columns returned by ResumeStore.get
+RECORD_COLUMNS = ["filename", "text", "sections", "skill_ids", "experience_years", "education"]
+
+
+def resume_columns(dim: int) -> List[Column]:
+    return [
+        Column("embedding", "fixed", "float32", dim),
+        Column("skill_bits", "fixed", "uint8", (len(SKILL_VOCABULARY) + 7) // 8),
+        Column("experience_years", "fixed", "int32"),
+        Column("skill_ids", "list", "int32"),
+        Column("filename", "str"),
+        Column("text", "str"),
+        Column("sections", "json"),
+        Column("education", "json"),
+    ]
+
+
+def skill_id_list(skills: List[str]) -> List[int]:
+    """SKILL_VOCABULARY indices of the known skills in a list"""
+    return [SKILL_INDEX[skill] for skill in skills if skill in SKILL_INDEX]
+
+
+def skill_bitset(skills: List[str]) -> np.ndarray:
+    """Pack a list of canonical skill names into a bitset over SKILL_VOCABULARY"""
+    bits = np.zeros(len(SKILL_VOCABULARY), dtype=bool)
+    for skill in skills:
+        index = SKILL_INDEX.get(skill)
+        if index is not None:
+            bits[index] = True
+    return np.packbits(bits)
+
+
+class ResumeStore:
+    """Append-only on-disk resume store with memory-mapped scoring columns.
+
+    Several worker processes may share one store directory: appends are
+    serialized with a file lock and each process picks up rows written by
+    the others the next time it reads.
+    """
+
+    def __init__(self, path: str, dim: int = EMBEDDING_DIM):
+        self.path = path
+        self.dim = dim
+        self.row_bytes = (len(SKILL_VOCABULARY) + 7) // 8
+        self.table = ColumnarStore(path, resume_columns(dim), {"vocabulary": SKILL_VOCABULARY})
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def add(self, text: str, sections: Dict[str, str], skills: List[str], filename: str = "",
+            embedding: Optional[np.ndarray] = None, experience_years: int = 0,
+            education: Optional[List[str]] = None) -> int:
+        """Append a parsed resume and return its id"""
+        return self.table.append([{
+            "embedding": embedding,
+            "skill_bits": skill_bitset(skills),
+            "experience_years": experience_years,
+            "skill_ids": skill_id_list(skills),
+            "filename": filename,
+            "text": text,
+            "sections": sections,
+            "education": education or [],
+        }])
+
+    def _arrays(self):
+        return self.table.scan("embedding", "skill_bits")
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Embedding matrix and packed skill bitsets of every stored resume, by id"""
+        return self._arrays()
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Stored records in id order"""
+        for resume_id in range(len(self)):
+            yield self.get(resume_id)
+
+    def get(self, resume_id: int, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Read one stored record, or only the given columns of it"""
+        record = self.table.row(resume_id, columns or RECORD_COLUMNS)
+        if "skill_ids" in record:
+            record["skills"] = [SKILL_VOCABULARY[i] for i in record.pop("skill_ids")]
+        return {"id": resume_id, **record}
+
+    def score(self, job_skills: List[str], job_embedding: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """Vectorized skill overlap and semantic similarity of every resume against one job"""
+        embeddings, skills = self._arrays()
+        count = len(embeddings)
+
+        skill_ids = sorted({SKILL_INDEX[s] for s in job_skills if s in SKILL_INDEX})
+        matched = np.zeros(count, dtype=np.int32)
+        for skill_id in skill_ids:
+            byte, bit = divmod(skill_id, 8)
+            matched += (skills[:, byte] & np.uint8(0x80 >> bit)) != 0
+        skill_match = matched / len(skill_ids) if skill_ids else np.zeros(count)
+
+        if job_embedding is not None:
+            # Raw cosine, as /analyze and the all-pairs scorer report it
+            semantic = embeddings @ np.asarray(job_embedding, dtype=np.float32)
+        else:
+            semantic = np.zeros(count, dtype=np.float32)
+
+        if skill_ids and job_embedding is not None:
+            combined = SKILL_WEIGHT * skill_match + SEMANTIC_WEIGHT * semantic
+        elif skill_ids:
+            combined = skill_match
+        else:
+            combined = semantic
+        return {"score": combined, "skill_match": skill_match, "semantic_similarity": semantic}
+
+    def top_k(self, job_skills: List[str], job_embedding: Optional[np.ndarray] = None, k: int = 50) -> List[Dict[str, Any]]:
+        """Return the k best resumes for a job, best first"""
+        scores = self.score(job_skills, job_embedding)
+        combined = scores["score"]
+        if len(combined) == 0:
+            return []
+        k = min(k, len(combined))
+        best = np.argpartition(-combined, k - 1)[:k]
+        best = best[np.argsort(-combined[best], kind="stable")]
+        return [
+            {
+                "resume_id": int(i),
+                "score": float(combined[i]),
+                "skill_match": float(scores["skill_match"][i]),
+                "semantic_similarity": float(scores["semantic_similarity"][i]),
+            }
+            for i in best
+        ]
+
+
+_store: Optional[ResumeStore] = None
+
+
+def get_resume_store() -> ResumeStore:
+    """Shared store, located by the RESUME_STORE_DIR environment variable"""
+    global _store
+    path = os.environ.get("RESUME_STORE_DIR", DEFAULT_STORE_DIR)
+    if _store is None or _store.path != path:
+        _store = ResumeStore(path)
+    return _store
+
+
+def embed_document(text: str) -> Optional[np.ndarray]:
+    """Embedding for a stored document, or None when the model is unavailable"""
+    if model is None or not text.strip():
+        return None
+    try:
+        return encode_texts([text])[0]
+    except Exception as e:
+        print(f"Error embedding document: {e}")
+        return None
+
+
+class ResumeRankingRequest(BaseModel):
+    job_description: str
+    top_k: int = 50
+
+class RankedResume(BaseModel):
+    resume_id: int
+    filename: str
+    score: float
+    skill_match: float
+    semantic_similarity: float
+    matching_skills: List[str]
+    missing_skills: List[str]
+
+class ResumeRankingResponse(BaseModel):
+    total_resumes: int
+    required_skills: List[str]
+    candidates: List[RankedResume]
+
+@router.post("/rank-resumes", response_model=ResumeRankingResponse)
+@thread_profiled
+def rank_resumes(request: ResumeRankingRequest):
+    """Rank stored resumes against a job description"""
+    if request.top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    try:
+        store = get_resume_store()
+        job_skills = extract_skills(request.job_description)
+        job_embedding = embed_document(request.job_description)
+
+        candidates = []
+        for hit in store.top_k(job_skills, job_embedding, request.top_k):
+            record = store.get(hit["resume_id"], ["filename", "skill_ids"])
+            resume_skills = set(record["skills"])
+            candidates.append({
+                **hit,
+                "filename": record["filename"],
+                "matching_skills": [s for s in job_skills if s in resume_skills],
+                "missing_skills": [s for s in job_skills if s not in resume_skills],
+            })
+
+        return {"total_resumes": len(store), "required_skills": job_skills, "candidates": candidates}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error ranking resumes: {str(e)}")
@@ -0,0 +1,181 @@
+"""
+Preforked multi-worker server for the AI service.
+
+    python serve.py --workers 4 --port 8000
+
+The master process imports ``main`` once - loading the sentence transformer,
+sklearn, NLTK data and the skill tables - warms the analysis path up, freezes
+the garbage collector and only then forks the workers. The workers share the
+model weights and static tables with the master copy-on-write, so each extra
+worker costs its private heap rather than another copy of the model.
+
+Workers all accept on one inherited listening socket. The master restarts
+workers that die and forwards SIGTERM/SIGINT on shutdown. Platforms without
+``os.fork`` fall back to a single uvicorn process.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Dict, List
+
+import uvicorn
+
+WARMUP_RESUME = "Experience\nPython developer with 5 years experience building REST APIs with Docker\n"
+WARMUP_JOB = "Looking for a Python engineer with Docker and AWS experience"
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on (respects affinity and cgroup pinning)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers() -> int:
+    return int(os.environ.get("WEB_CONCURRENCY", available_cores()))
+
+
+def _set_torch_threads(threads: int) -> None:
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def preload() -> object:
+    """Import the app and run one analysis so lazy initialization happens before fork"""
+    # An OpenMP pool started in the master is not fork-safe; keep it single-threaded
+    with contextlib.suppress(ImportError):
+        import torch
+        torch.set_num_threads(1)
+
+    import main
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.build_analysis(WARMUP_RESUME, WARMUP_JOB)
+
+    # Move everything allocated so far out of the collector's generations, so
+    # GC passes in the workers do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    return main.app
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app: object, sock: socket.socket, threads: int, log_level: str) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    _set_torch_threads(threads)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="off")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def spawn(app: object, sock: socket.socket, threads: int, log_level: str) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, threads, log_level)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info") -> None:
+    app = preload()
+    if workers <= 1 or not hasattr(os, "fork"):
+        # Nothing is forked, so the one process can use every core again
+        _set_torch_threads(available_cores())
+        uvicorn.run(app, host=host, port=port, log_level=log_level)
+        return
+
+    sock = bind_socket(host, port)
+    threads = max(1, available_cores() // workers)
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def shutdown(signum: int, frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for slot in range(workers):
+        children[spawn(app, sock, threads, log_level)] = slot
+    print(f"Master {os.getpid()} serving on {host}:{port} with {workers} workers "
+          f"({threads} torch thread(s) each)", flush=True)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {status}; restarting", flush=True)
+        time.sleep(0.5)
+        children[spawn(app, sock, threads, log_level)] = slot
+    sock.close()
+
+
+def worker_pids(master_pid: int) -> List[int]:
+    """Direct children of a master process (Linux /proc)"""
+    pids: List[int] = []
+    task_dir = f"/proc/{master_pid}/task"
+    for task in os.listdir(task_dir):
+        with open(os.path.join(task_dir, task, "children")) as f:
+            pids += [int(pid) for pid in f.read().split()]
+    return pids
+
+
+def memory_usage(pid: int) -> Dict[str, int]:
+    """RSS, PSS and shared/private bytes of a process from /proc/<pid>/smaps_rollup"""
+    usage: Dict[str, int] = {}
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared_clean", "Shared_Dirty": "shared_dirty",
+              "Private_Clean": "private_clean", "Private_Dirty": "private_dirty"}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in fields:
+                usage[fields[name]] = int(rest.split()[0]) * 1024
+    return usage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the AI service with preforked workers")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="Worker processes (default: WEB_CONCURRENCY or available cores)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Fuzzy skill normalization against a precomputed skill embedding matrix.
+
+``extract_skills`` only finds exact spellings from the skills database.
+``SkillNormalizer`` also maps variants such as "ReactJS", "postgres" or
+"k8s" to canonical skill names:
+
+1. Every canonical skill, plus the alias spellings in ``SKILL_ALIASES``, is
+   encoded once into a row of an L2-normalized matrix.
+2. Candidate 1-3 word n-grams are taken from the text. Exact (case-folded)
+   skill or alias spellings match directly without being encoded.
+3. With the sentence transformer, the remaining n-grams are first scored
+   with the cheap character n-gram encoder and only the closest
+   ``MAX_ENCODED_CANDIDATES`` go through the model, so a long resume costs
+   one small batch rather than an encode of every n-gram.
+4. N-grams not seen before are encoded in one batch and cached, and one
+   matrix multiply scores them against every row. The best row above the
+   threshold gives the canonical skill.
+
+The sentence transformer from ``utils`` is used when it loaded. Otherwise the
+hashed character n-gram encoder is used, which catches spelling variants but
+not abbreviations; ``SKILL_ALIASES`` covers those for both encoders.
+
+``extract_skills`` only runs the normalizer when ``FUZZY_SKILLS=1``. Under a
+request deadline that the transformer encode would overrun, only the exact
+spellings are used and ``skills`` is recorded as degraded.
+"""
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from deadlines import Deadline, allows, observe
+from utils import SKILL_VOCABULARY, encode_texts, model
+
+Encoder = Callable[[List[str]], np.ndarray]
+
+# Common alternative spellings and abbreviations of canonical skills
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "JavaScript": ["JS", "ECMAScript"],
+    "TypeScript": ["TS"],
+    "C++": ["cpp"],
+    "C#": ["C Sharp", "csharp"],
+    "Go": ["golang"],
+    "React": ["ReactJS", "React.js"],
+    "Angular": ["AngularJS"],
+    "Vue.js": ["Vue", "VueJS"],
+    "Node.js": ["Node", "NodeJS"],
+    "Ruby on Rails": ["Rails", "RoR"],
+    "Tailwind CSS": ["Tailwind"],
+    "PostgreSQL": ["postgres", "psql"],
+    "MongoDB": ["mongo"],
+    "Microsoft Teams": ["MS Teams"],
+    "Kubernetes": ["k8s", "kube"],
+    "Google Cloud": ["GCP", "Google Cloud Platform"],
+    "AWS": ["Amazon Web Services"],
+    "Azure": ["Microsoft Azure"],
+    "Machine Learning": ["ML"],
+    "Scikit-learn": ["sklearn", "scikit learn"],
+    "Power BI": ["PowerBI"],
+    "REST API": ["RESTful API", "REST APIs"],
+    "Objective-C": ["ObjC"],
+}
+
+# N-grams starting or ending with one of these are not skill candidates
+EDGE_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the their to using was "
+    "we were will with you your".split()
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+TRANSFORMER_THRESHOLD = 0.8
+CHAR_NGRAM_THRESHOLD = 0.75
+CHAR_NGRAM_DIM = 1024
+
+# Transformer prefilter: character n-gram similarity an n-gram needs to be
+# encoded at all, and the most n-grams encoded per text
+PREFILTER_THRESHOLD = 0.45
+MAX_ENCODED_CANDIDATES = 64
+
+
+def char_ngram_encode(texts: List[str]) -> np.ndarray:
+    """Hashed character bigram/trigram counts, L2-normalized"""
+    vectors = np.zeros((len(texts), CHAR_NGRAM_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        padded = "<" + re.sub(r"[^a-z0-9+#]", "", text.lower()) + ">"
+        for n in (2, 3):
+            for i in range(len(padded) - n + 1):
+                vectors[row, zlib.crc32(padded[i:i + n].encode()) % CHAR_NGRAM_DIM] += 1
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def candidate_ngrams(text: str, max_words: int = 3) -> List[str]:
+    """Distinct lowercase 1..max_words word n-grams that could name a skill"""
+    tokens = [token.rstrip("./-") for token in TOKEN_PATTERN.findall(text.lower())]
+    candidates: Dict[str, None] = {}
+    for start in range(len(tokens)):
+        for length in range(1, max_words + 1):
+            words = tokens[start:start + length]
+            if len(words) < length or words[0] in EDGE_WORDS or words[-1] in EDGE_WORDS:
+                continue
+            phrase = " ".join(words)
+            if len(phrase) >= 2 and not phrase.replace(" ", "").isdigit():
+                candidates[phrase] = None
+    return list(candidates)
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9+#]+", text.lower()))
+
+
+class SkillNormalizer:
+    """Maps free-text phrases to canonical skills by embedding similarity"""
+
+    def __init__(self, vocabulary: List[str] = SKILL_VOCABULARY,
+                 aliases: Dict[str, List[str]] = SKILL_ALIASES,
+                 encode: Optional[Encoder] = None, threshold: Optional[float] = None,
+                 cache_size: int = 100_000, prefilter: Optional[bool] = None):
+        if encode is None:
+            encode = encode_texts if model is not None else char_ngram_encode
+            default_threshold = TRANSFORMER_THRESHOLD if model is not None else CHAR_NGRAM_THRESHOLD
+        else:
+            default_threshold = TRANSFORMER_THRESHOLD
+        self.encode = encode
+        self.threshold = threshold if threshold is not None else default_threshold
+
+        # One matrix row per surface form; row_skill maps rows back to canonical names
+        forms: List[str] = list(vocabulary)
+        self.row_skill: List[str] = list(vocabulary)
+        for skill, spellings in aliases.items():
+            if skill in vocabulary:
+                forms += spellings
+                self.row_skill += [skill] * len(spellings)
+        self.row_words = [_words(form) for form in forms]
+        self.matrix = np.ascontiguousarray(self.encode(forms), dtype=np.float32)
+        self.exact = {form.lower(): (row, skill) for row, (form, skill) in enumerate(zip(forms, self.row_skill))}
+
+        # Screen candidates with character n-grams before an expensive encoder
+        if prefilter is None:
+            prefilter = self.encode is not char_ngram_encode
+        self.prefilter_matrix = char_ngram_encode(forms) if prefilter else None
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _embed(self, phrases: List[str]) -> np.ndarray:
+        """Embeddings of phrases, encoding only the ones missing from the cache"""
+        with self._lock:
+            cached = {p: self._cache[p] for p in phrases if p in self._cache}
+            for phrase in cached:
+                self._cache.move_to_end(phrase)
+        missing = [p for p in phrases if p not in cached]
+        if missing:
+            encoded = np.asarray(self.encode(missing), dtype=np.float32)
+            with self._lock:
+                for phrase, vector in zip(missing, encoded):
+                    cached[phrase] = vector
+                    self._cache[phrase] = vector
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return np.stack([cached[p] for p in phrases])
+
+    def shortlist(self, phrases: List[str]) -> List[str]:
+        """Exact spellings plus the other phrases worth sending to the encoder"""
+        if self.prefilter_matrix is None:
+            return phrases
+        exact = [p for p in phrases if p in self.exact]
+        rest = [p for p in phrases if p not in self.exact]
+        if not rest:
+            return exact
+        scores = (char_ngram_encode(rest) @ self.prefilter_matrix.T).max(axis=1)
+        order = np.argsort(-scores, kind="stable")[:MAX_ENCODED_CANDIDATES]
+        return exact + [rest[i] for i in order if scores[i] >= PREFILTER_THRESHOLD]
+
+    def _uncached(self, phrases: List[str]) -> List[str]:
+        with self._lock:
+            return [p for p in phrases if p not in self.exact and p not in self._cache]
+
+    def match(self, phrases: List[str]) -> List[Tuple[str, str, float]]:
+        """(phrase, canonical skill, similarity) for each phrase that names a skill"""
+        matches = [(p, self.exact[p][1], 1.0) for p in phrases if p in self.exact]
+        phrases = [p for p in phrases if p not in self.exact]
+        if not phrases:
+            return matches
+        scores = self._embed(phrases) @ self.matrix.T
+        best = scores.argmax(axis=1)
+        for phrase, row, score in zip(phrases, best, scores[np.arange(len(phrases)), best]):
+            if score < self.threshold:
+                continue
+            # A phrase that is only part of a multi-word skill ("management" vs
+            # "Time Management") is too generic to count as that skill
+            words = _words(phrase)
+            if words < self.row_words[row]:
+                continue
+            matches.append((phrase, self.row_skill[row], float(score)))
+        return matches
+
+    def normalize(self, phrase: str) -> Optional[str]:
+        """Canonical skill for a single phrase, or None"""
+        matches = self.match([phrase.lower().strip()])
+        return matches[0][1] if matches else None
+
+    def extract(self, text: str, deadline: Optional[Deadline] = None) -> List[str]:
+        """Canonical skills named anywhere in text, in order of first mention"""
+        candidates = candidate_ngrams(text)
+        phrases = self.shortlist(candidates)
+        missing = self._uncached(phrases) if self.prefilter_matrix is not None else []
+        if missing and not allows(deadline, "encode_phrase", len(missing)):
+            deadline.degrade("skills", "exact_aliases")
+            phrases, missing = [p for p in phrases if p in self.exact], []
+        start = time.perf_counter()
+        matched = {phrase: skill for phrase, skill, _ in self.match(phrases)}
+        if missing:
+            observe("encode_phrase", start, len(missing))
+        skills: Dict[str, None] = {}
+        for phrase in candidates:
+            if phrase in matched:
+                skills[matched[phrase]] = None
+        return list(skills)
+
+
+_normalizer: Optional[SkillNormalizer] = None
+_normalizer_lock = threading.Lock()
+
+
+def get_skill_normalizer() -> SkillNormalizer:
+    """Shared normalizer; SKILL_MATCH_THRESHOLD overrides the similarity threshold"""
+    global _normalizer
+    with _normalizer_lock:
+        if _normalizer is None:
+            threshold = os.environ.get("SKILL_MATCH_THRESHOLD")
+            _normalizer = SkillNormalizer(threshold=float(threshold) if threshold else None)
+        return _normalizer
+
+
+def fuzzy_skills_enabled() -> bool:
+    return os.environ.get("FUZZY_SKILLS", "0").lower() in ("1", "true", "yes")
@@ -0,0 +1,147 @@
+"""
+Tests for priority-aware admission control.
+"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+
+from admission import SHED, AdmissionController, AdmissionMiddleware, TrafficClass
+from metrics import router as metrics_router
+
+
+def _classes(interactive_timeout: float = 5.0, bulk_quota: int = 10) -> list:
+    return [
+        TrafficClass("interactive", weight=4, paths=["/analyze"], queue_timeout=interactive_timeout,
+                     max_queue=10, client_quota=10),
+        TrafficClass("bulk", weight=1, paths=["/process-document"], queue_timeout=5.0,
+                     max_queue=10, client_quota=bulk_quota),
+    ]
+
+
+def test_weighted_scheduling_prefers_interactive() -> None:
+    """With both queues backed up, interactive requests get most of the slots."""
+    async def scenario() -> list:
+        controller = AdmissionController(_classes(), max_concurrency=1)
+        interactive, bulk = controller.classes["interactive"], controller.classes["bulk"]
+        order = []
+
+        async def request(traffic_class: TrafficClass, client: str) -> None:
+            assert await controller.acquire(traffic_class, client) is None
+            order.append(traffic_class.name)
+            await asyncio.sleep(0)
+            controller.release(traffic_class, client, 0.01)
+
+        assert await controller.acquire(bulk, "holder") is None
+        tasks = [asyncio.create_task(request(bulk, f"b{i}")) for i in range(5)]
+        tasks += [asyncio.create_task(request(interactive, f"i{i}")) for i in range(5)]
+        await asyncio.sleep(0)
+        controller.release(bulk, "holder", 0.01)
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(scenario())
+    assert order[:5].count("interactive") >= 4
+    assert sorted(order) == ["bulk"] * 5 + ["interactive"] * 5
+
+
+def test_client_quota_lets_other_clients_through() -> None:
+    """A client at its quota is skipped in favour of other clients."""
+    async def scenario() -> list:
+        controller = AdmissionController(_classes(bulk_quota=1), max_concurrency=2)
+        bulk = controller.classes["bulk"]
+        assert await controller.acquire(bulk, "backend") is None
+
+        blocked = asyncio.create_task(controller.acquire(bulk, "backend"))
+        other = asyncio.create_task(controller.acquire(bulk, "other"))
+        await asyncio.sleep(0.01)
+        state = [blocked.done(), other.done()]
+        controller.release(bulk, "backend", 0.01)
+        await asyncio.sleep(0.01)
+        return state + [blocked.done()]
+
+    assert asyncio.run(scenario()) == [False, True, True]
+
+
+def test_deadline_sheds_with_retry_after() -> None:
+    """Requests still queued at their deadline get 429 with Retry-After."""
+    app = FastAPI()
+
+    @app.post("/analyze")
+    async def analyze():
+        # Blocking work, off the loop as in main.analyze_match
+        await run_in_threadpool(time.sleep, 0.3)
+        return {"ok": True}
+
+    controller = AdmissionController(_classes(interactive_timeout=0.05), max_concurrency=1)
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    app.include_router(metrics_router)
+    before = SHED.value(traffic_class="interactive", reason="deadline")
+
+    async def burst() -> list:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/analyze") for _ in range(3)))
+
+    responses = asyncio.run(burst())
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses == [200, 429, 429]
+    shed = [r for r in responses if r.status_code == 429][0]
+    assert int(shed.headers["retry-after"]) >= 1
+    assert SHED.value(traffic_class="interactive", reason="deadline") == before + 2
+
+    metrics = TestClient(app).get("/metrics").text
+    assert 'admission_shed_total{traffic_class="interactive",reason="deadline"}' in metrics
+
+
+def test_admitted_blocking_handlers_run_concurrently() -> None:
+    """Admitted slots overlap when handlers keep their blocking work off the event loop."""
+    app = FastAPI()
+
+    @app.post("/analyze")
+    async def analyze():
+        await run_in_threadpool(time.sleep, 0.3)
+        return {"ok": True}
+
+    app.add_middleware(AdmissionMiddleware, controller=AdmissionController(_classes(), max_concurrency=2))
+
+    async def burst() -> list:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/analyze") for _ in range(2)))
+
+    start = time.perf_counter()
+    responses = asyncio.run(burst())
+    assert [r.status_code for r in responses] == [200, 200]
+    assert time.perf_counter() - start < 0.55
+
+
+def test_traffic_class_header_needs_trusted_peer() -> None:
+    """X-Traffic-Class is ignored unless the peer is listed as trusted."""
+    seen = []
+
+    async def app(scope, receive, send) -> None:
+        seen.append(controller.classes["interactive"].running)
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def call(middleware: AdmissionMiddleware) -> None:
+        scope = {"type": "http", "path": "/process-document", "client": ("10.0.0.5", 1234),
+                 "headers": [(b"x-traffic-class", b"interactive")]}
+        await middleware(scope, None, lambda message: asyncio.sleep(0))
+
+    controller = AdmissionController(_classes(), max_concurrency=1)
+    asyncio.run(call(AdmissionMiddleware(app, controller, trusted=set())))
+    asyncio.run(call(AdmissionMiddleware(app, controller, trusted={"10.0.0.5"})))
+    assert seen == [0, 1]
+
+
+def test_unclassified_paths_bypass_admission() -> None:
+    """Paths outside every traffic class are never queued."""
+    controller = AdmissionController(_classes(), max_concurrency=1)
+    assert controller.classify("/metrics", None) is None
+    assert controller.classify("/analyze/stream", None).name == "interactive"
+    assert controller.classify("/analyze", "bulk").name == "bulk"
@@ -0,0 +1,115 @@
+"""
+Tests for the blockwise all-pairs scoring engine.
+"""
+import json
+
+import numpy as np
+
+from all_pairs import BYTES_PER_PAIR, BYTES_PER_ROW, COMPONENTS, AllPairsScorer, block_shape
+from main import calculate_keyword_density, calculate_skill_match
+
+RESUMES = [
+    ("Python developer with Docker and AWS", ["Python", "Docker", "AWS"]),
+    ("Designer using Figma and Sketch daily", ["Figma", "Sketch"]),
+    ("React and TypeScript frontend engineer", ["React", "TypeScript"]),
+    ("Data scientist: Python, Pandas, NumPy", ["Python", "Pandas", "NumPy"]),
+    ("Go and Kubernetes platform work", ["Go", "Kubernetes"]),
+]
+JOBS = [
+    ("backend", "Python engineer with Docker on AWS", ["Python", "Docker", "AWS"]),
+    ("design", "Product designer fluent in Figma", ["Figma"]),
+    ("frontend", "Frontend engineer, React and TypeScript", ["React", "TypeScript"]),
+]
+
+
+def _scorer(rng, memory_mb=256, workers=1, with_embeddings=True):
+    from resume_store import skill_bitset
+
+    embeddings = rng.normal(size=(len(RESUMES), 8)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    jobs = []
+    for job_id, description, skills in JOBS:
+        vector = rng.normal(size=8).astype(np.float32)
+        jobs.append({"id": job_id, "description": description, "skills": skills,
+                     "embedding": vector / np.linalg.norm(vector) if with_embeddings else None})
+    bits = np.stack([skill_bitset(skills) for _, skills in RESUMES])
+    return AllPairsScorer(embeddings, bits, [text for text, _ in RESUMES], jobs,
+                          k=2, memory_mb=memory_mb, workers=workers)
+
+
+def _expected(scorer):
+    """Per-pair scores computed one pair at a time with the /analyze functions"""
+    scores = np.zeros((len(RESUMES), len(JOBS)))
+    for r, (text, skills) in enumerate(RESUMES):
+        for j, job in enumerate(scorer.jobs):
+            parts = {
+                "skill_match": calculate_skill_match(skills, job["skills"]),
+                "keyword_density": calculate_keyword_density(text, job["description"]),
+                "semantic_similarity": float(scorer.resume_embeddings[r] @ job["embedding"]),
+            }
+            scores[r, j] = sum(w * parts[name] for name, w in zip(COMPONENTS, scorer.weights))
+    return scores
+
+
+def test_blocks_match_pairwise_scoring(tmp_path) -> None:
+    """Small blocks on several threads give the same matrix and top-K as pairwise scoring."""
+    scorer = _scorer(np.random.default_rng(0), memory_mb=1e-4, workers=2)
+    assert scorer.block_rows < len(RESUMES) and scorer.block_cols < len(JOBS)
+
+    stats = scorer.run(str(tmp_path), [f"r{i}.pdf" for i in range(len(RESUMES))], write_matrix=True)
+
+    expected = _expected(scorer)
+    np.testing.assert_allclose(np.load(tmp_path / "scores.npy"), expected, atol=1e-5)
+    assert stats["pairs"] == len(RESUMES) * len(JOBS)
+
+    resume_rows = [json.loads(line) for line in (tmp_path / "resume_top.jsonl").read_text().splitlines()]
+    assert sorted(row["resume_id"] for row in resume_rows) == list(range(len(RESUMES)))
+    for row in resume_rows:
+        best = np.argsort(-expected[row["resume_id"]], kind="stable")[:2]
+        assert [m["job_id"] for m in row["matches"]] == [JOBS[j][0] for j in best]
+        assert abs(row["matches"][0]["score"] - expected[row["resume_id"], best[0]]) < 1e-4
+
+    job_rows = {json.loads(line)["job_id"]: json.loads(line) for line in (tmp_path / "job_top.jsonl").read_text().splitlines()}
+    for j, (job_id, _, _) in enumerate(JOBS):
+        best = np.argsort(-expected[:, j], kind="stable")[:2]
+        assert [m["resume_id"] for m in job_rows[job_id]["matches"]] == list(best)
+
+
+def test_components_without_embeddings(tmp_path) -> None:
+    """Without a model the semantic weight drops out and components are still reported."""
+    scorer = _scorer(np.random.default_rng(1), with_embeddings=False)
+    scorer.run(str(tmp_path), [""] * len(RESUMES))
+
+    job_rows = [json.loads(line) for line in (tmp_path / "job_top.jsonl").read_text().splitlines()]
+    design = next(row for row in job_rows if row["job_id"] == "design")
+    top = design["matches"][0]
+    assert top["resume_id"] == 1
+    assert top["skill_match"] == 1.0
+    assert top["semantic_similarity"] == 0.0
+    assert abs(top["keyword_density"] - calculate_keyword_density(RESUMES[1][0], JOBS[1][1])) < 1e-4
+
+
+def test_block_shape_counts_per_row_buffers() -> None:
+    """With few jobs the per-row skill and embedding buffers dominate and are budgeted."""
+    row_bytes = BYTES_PER_ROW + 384 * 4
+    rows, cols = block_shape(1_000_000, 10, row_bytes, memory_mb=256, workers=4)
+    assert cols == 10
+    assert rows * (cols * BYTES_PER_PAIR + row_bytes) <= 256 * 1024 * 1024 / 4
+
+    rows, cols = block_shape(1_000_000, 10_000_000, row_bytes, memory_mb=1, workers=1)
+    assert rows == 1 and cols * BYTES_PER_PAIR + row_bytes <= 1024 * 1024
+
+
+def test_no_jobs_or_blank_descriptions(tmp_path) -> None:
+    """An empty job list or jobs without description terms score without a vocabulary error."""
+    scorer = _scorer(np.random.default_rng(2))
+    empty = AllPairsScorer(scorer.resume_embeddings, scorer.resume_skill_bits, [text for text, _ in RESUMES], [])
+    stats = empty.run(str(tmp_path / "empty"), [""] * len(RESUMES))
+    assert stats["pairs"] == 0
+    assert (tmp_path / "empty" / "job_top.jsonl").read_text() == ""
+
+    jobs = [dict(job, description="  ") for job in scorer.jobs]
+    blank = AllPairsScorer(scorer.resume_embeddings, scorer.resume_skill_bits, [text for text, _ in RESUMES], jobs)
+    blank.run(str(tmp_path / "blank"), [""] * len(RESUMES))
+    rows = [json.loads(line) for line in (tmp_path / "blank" / "resume_top.jsonl").read_text().splitlines()]
+    assert all(match["keyword_density"] == 0.0 for row in rows for match in row["matches"])
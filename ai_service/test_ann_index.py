@@ -0,0 +1,130 @@
+"""
+Tests for the approximate nearest-neighbour job index.
+"""
+import numpy as np
+import pytest
+
+from ann_index import IVFIndex
+
+
+def _vectors(count: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((count, dim)).astype(np.float32)
+
+
+def test_full_probe_matches_brute_force() -> None:
+    """Probing every list is an exact search."""
+    vectors = _vectors(500)
+    index = IVFIndex(16, n_lists=8)
+    index.add(np.arange(500), vectors)
+
+    query = vectors[42]
+    ids, scores = index.search(query, k=5, nprobe=8)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    assert ids.tolist() == expected.tolist()
+    assert ids[0] == 42
+    assert abs(scores[0] - 1.0) < 1e-5
+
+
+def test_incremental_insert_and_delete() -> None:
+    """Deleted ids disappear and re-inserted ids replace the old vector."""
+    vectors = _vectors(200)
+    index = IVFIndex(16, n_lists=4)
+    index.add(np.arange(200), vectors)
+    assert len(index) == 200
+
+    assert index.remove([7, 9999]) == 1
+    assert 7 not in index
+    ids, _ = index.search(vectors[7], k=3, nprobe=4)
+    assert 7 not in ids.tolist()
+
+    index.add([3], vectors[[150]])
+    ids, _ = index.search(vectors[150], k=2, nprobe=4)
+    assert set(ids.tolist()) == {3, 150}
+    assert len(index) == 199
+
+
+def test_save_and_mmap_load(tmp_path) -> None:
+    """A saved index reloads memory-mapped and keeps accepting updates."""
+    vectors = _vectors(300)
+    index = IVFIndex(16, n_lists=6)
+    index.add(np.arange(300), vectors)
+    index.remove([0, 1])
+    index.save(str(tmp_path))
+
+    loaded = IVFIndex.load(str(tmp_path))
+    assert isinstance(loaded._vectors, np.memmap)
+    assert len(loaded) == 298
+
+    loaded.add([1000], vectors[[0]])
+    loaded.remove([2])
+    ids, _ = loaded.search(vectors[0], k=1, nprobe=6)
+    assert ids.tolist() == [1000]
+
+    loaded.save(str(tmp_path))
+    reloaded = IVFIndex.load(str(tmp_path))
+    assert len(reloaded) == 298
+    assert 2 not in reloaded and 1000 in reloaded
+    assert 5 in reloaded and 12345 not in reloaded
+
+
+def test_search_on_empty_index_pads_results() -> None:
+    """Searching before anything is added returns padded rows."""
+    index = IVFIndex(16)
+    ids, scores = index.search(_vectors(1)[0], k=3)
+    assert ids.tolist() == [-1, -1, -1]
+    assert np.isneginf(scores).all()
+
+
+def test_nprobe_must_be_positive() -> None:
+    """nprobe=0 is rejected instead of falling back to the default."""
+    index = IVFIndex(16, n_lists=4)
+    index.add(np.arange(50), _vectors(50))
+    with pytest.raises(ValueError):
+        index.search(_vectors(1)[0], k=3, nprobe=0)
+
+
+def test_incremental_fill_trains_once_enough_vectors() -> None:
+    """An index filled from empty scans exactly until it has enough vectors, then trains full-size."""
+    vectors = _vectors(400)
+    index = IVFIndex(16, n_lists=8)
+    index.add([0], vectors[[0]])
+    assert not index.is_trained
+    assert index.search(vectors[0], k=1)[0].tolist() == [0]
+
+    index.add(np.arange(1, 400), vectors[1:])
+    assert index.is_trained and index.n_cells == 8
+    assert len(index) == 400
+    ids, _ = index.search(vectors[123], k=1, nprobe=8)
+    assert ids.tolist() == [123]
+
+
+def test_retrain_reassigns_stored_vectors() -> None:
+    """Training an index that holds vectors re-assigns them to the new cells."""
+    vectors = _vectors(600)
+    index = IVFIndex(16, n_lists=8, seed=1)
+    index.train(vectors[:100])
+    index.add(np.arange(600), vectors)
+    assert index.n_cells == 2
+
+    index.train()
+    assert index.n_cells == 8 and len(index) == 600
+    for i in (5, 250, 599):
+        ids, _ = index.search(vectors[i], k=1, nprobe=1)
+        assert ids.tolist() == [i]
+
+
+def test_save_swaps_whole_versions(tmp_path) -> None:
+    """Each save is a complete version; CURRENT points at the newest and old ones are pruned."""
+    vectors = _vectors(300)
+    index = IVFIndex(16, n_lists=4)
+    index.add(np.arange(300), vectors)
+    for _ in range(3):
+        index.save(str(tmp_path))
+
+    versions = sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("v"))
+    assert len(versions) == 2
+    assert (tmp_path / "CURRENT").read_text() == versions[-1]
+    assert len(IVFIndex.load(str(tmp_path))) == 300
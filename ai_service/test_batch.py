@@ -0,0 +1,113 @@
+"""
+Tests for the offline batch scoring CLI.
+"""
+import json
+
+import pytest
+
+import batch
+from benchmarks.fixtures import docx_from_text
+
+RESUMES = {
+    "python.txt": "Experience\nPython developer with Docker and AWS, 5 years building REST APIs",
+    "design.txt": "Experience\nProduct designer working in Figma and Sketch",
+}
+JOBS = [
+    {"id": "backend", "description": "Backend engineer with Python, Docker and AWS experience"},
+    {"id": "design", "description": "UI designer fluent in Figma"},
+]
+
+
+def _corpus(tmp_path):
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    for name, text in RESUMES.items():
+        (resumes / name).write_text(text)
+    (resumes / "notes.md").write_text("ignored")
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text("".join(json.dumps(job) + "\n" for job in JOBS))
+    return resumes, jobs
+
+
+def _rows(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_scores_every_resume_job_pair(tmp_path) -> None:
+    """Each resume is scored against each job with /analyze's scoring."""
+    resumes, jobs = _corpus(tmp_path)
+    (resumes / "nested").mkdir()
+    (resumes / "nested" / "cv.docx").write_bytes(docx_from_text(RESUMES["python.txt"]))
+    output = tmp_path / "scores.jsonl"
+
+    stats = batch.run(str(resumes), str(jobs), str(output), chunk_size=2)
+
+    rows = _rows(output)
+    assert stats["resumes"] == 3 and stats["pairs"] == 6
+    assert {(row["resume"], row["job_id"]) for row in rows} == {
+        (name, job["id"]) for name in ("design.txt", "nested/cv.docx", "python.txt") for job in JOBS
+    }
+    scores = {(row["resume"], row["job_id"]): row for row in rows}
+    assert scores[("python.txt", "backend")]["overall_score"] > scores[("design.txt", "backend")]["overall_score"]
+    assert scores[("design.txt", "design")]["matching_skills"] == ["Figma"]
+    assert scores[("nested/cv.docx", "backend")]["skill_match"] == scores[("python.txt", "backend")]["skill_match"]
+
+
+def test_rerun_resumes_from_checkpoint(tmp_path) -> None:
+    """A rerun scores only new resumes and drops rows written after the last checkpoint."""
+    resumes, jobs = _corpus(tmp_path)
+    output = tmp_path / "scores.jsonl"
+    batch.run(str(resumes), str(jobs), str(output), chunk_size=1)
+    with open(output, "a") as f:
+        f.write('{"resume": "partial')  # interrupted write
+
+    (resumes / "late.txt").write_text("Python engineer")
+    stats = batch.run(str(resumes), str(jobs), str(output), chunk_size=1)
+
+    rows = _rows(output)
+    assert stats["resumes"] == 1
+    assert len(rows) == 6
+    assert sorted({row["resume"] for row in rows}) == ["design.txt", "late.txt", "python.txt"]
+
+
+def test_process_pool_matches_serial(tmp_path) -> None:
+    """Chunks scored in worker processes produce the same rows as in-process scoring."""
+    resumes, jobs = _corpus(tmp_path)
+    serial, pooled = tmp_path / "serial.jsonl", tmp_path / "pooled.jsonl"
+
+    batch.run(str(resumes), str(jobs), str(serial), workers=1, chunk_size=1)
+    batch.run(str(resumes), str(jobs), str(pooled), workers=2, chunk_size=1)
+
+    key = lambda row: (row["resume"], row["job_id"])
+    assert sorted(_rows(pooled), key=key) == sorted(_rows(serial), key=key)
+
+
+def test_serial_run_keeps_torch_threads(tmp_path) -> None:
+    """An in-process run does not pin the caller's torch thread count."""
+    torch = pytest.importorskip("torch")
+    resumes, jobs = _corpus(tmp_path)
+    before = torch.get_num_threads()
+    torch.set_num_threads(2)
+    try:
+        batch.run(str(resumes), str(jobs), str(tmp_path / "scores.jsonl"), workers=1)
+        assert torch.get_num_threads() == 2
+    finally:
+        torch.set_num_threads(before)
+
+
+def test_job_encoding_uses_all_cores(monkeypatch) -> None:
+    """Jobs are encoded with every available core even when preload pinned torch to one thread."""
+    torch = pytest.importorskip("torch")
+    import serve
+
+    monkeypatch.setattr(serve, "available_cores", lambda: 3)
+    seen = []
+    monkeypatch.setattr(batch, "prepare_jobs", lambda jobs: seen.append(torch.get_num_threads()) or [])
+    before = torch.get_num_threads()
+    torch.set_num_threads(1)
+    try:
+        with batch.all_torch_threads():
+            batch.prepare_jobs([])
+        assert seen == [3] and torch.get_num_threads() == 1
+    finally:
+        torch.set_num_threads(before)
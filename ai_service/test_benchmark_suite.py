@@ -0,0 +1,54 @@
+"""
+Tests for the benchmark suite's load generator and baseline comparison.
+"""
+import asyncio
+
+from fastapi import FastAPI
+
+from benchmarks.load import percentile, run_load
+from benchmarks.suite import compare
+
+
+def _results(median: float, p95: float, throughput: float) -> dict:
+    return {
+        "micro": {"extract_skills[small]": {"median_s": median, "p95_s": median * 3}},
+        "load": {"/analyze": {"p95_s": p95, "throughput_rps": throughput}},
+    }
+
+
+def test_percentile_interpolates() -> None:
+    """Percentiles interpolate between samples."""
+    values = [0.1, 0.2, 0.3, 0.4, 0.5]
+    assert percentile(values, 50) == 0.3
+    assert abs(percentile(values, 95) - 0.48) < 1e-9
+    assert percentile([], 99) == 0.0
+
+
+def test_compare_flags_only_regressions_beyond_threshold() -> None:
+    """Slower latencies and lower throughput beyond the threshold are regressions."""
+    baseline = _results(median=0.010, p95=0.100, throughput=50.0)
+
+    assert compare(baseline, _results(0.011, 0.110, 46.0), threshold=0.2) == []
+
+    regressions = compare(baseline, _results(0.020, 0.100, 30.0), threshold=0.2)
+    assert [key for key, *_ in regressions] == [
+        "micro.extract_skills[small].median_s",
+        "load./analyze.throughput_rps",
+    ]
+
+
+def test_run_load_reports_latency_percentiles() -> None:
+    """The in-process load generator counts successes and errors separately."""
+    app = FastAPI()
+
+    @app.get("/ok/{i}")
+    async def ok(i: int):
+        return {"ok": i}
+
+    stats = asyncio.run(run_load(lambda i: {"method": "GET", "url": f"/ok/{i}"}, 20, 4, app=app))
+    assert stats["requests"] == 20
+    assert stats["errors"] == 0
+    assert 0 < stats["p50_s"] <= stats["p95_s"] <= stats["p99_s"]
+
+    stats = asyncio.run(run_load(lambda i: {"method": "GET", "url": "/missing"}, 5, 2, app=app))
+    assert stats["errors"] == 5
@@ -0,0 +1,106 @@
+"""
+Tests for the memory-mapped columnar store and the job store built on it.
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from columnar_store import Column, ColumnarStore, row_ids
+from job_store import JobStore
+
+COLUMNS = [
+    Column("vector", "fixed", "float32", 3),
+    Column("years", "fixed", "int32"),
+    Column("tags", "list", "int32"),
+    Column("name", "str"),
+    Column("info", "json"),
+]
+
+
+def test_append_and_read_columns(tmp_path) -> None:
+    """Rows round-trip and fixed columns are served from memory maps."""
+    store = ColumnarStore(str(tmp_path), COLUMNS)
+    assert store.append([
+        {"vector": [1, 2, 3], "years": 5, "tags": [4, 7], "name": "Zoë", "info": {"a": [1]}},
+        {"years": 2, "name": "second"},
+    ]) == 0
+    assert store.append([{"tags": [9], "name": "third"}]) == 2
+
+    reopened = ColumnarStore(str(tmp_path), COLUMNS)
+    assert len(reopened) == 3
+    years = reopened.column("years")
+    assert isinstance(years, np.memmap)
+    assert years.tolist() == [5, 2, 0]
+    assert reopened.column("vector")[0].tolist() == [1.0, 2.0, 3.0]
+    first = reopened.row(0)
+    assert first.pop("vector").tolist() == [1.0, 2.0, 3.0]
+    assert first == {"years": 5, "tags": [4, 7], "name": "Zoë", "info": {"a": [1]}}
+    assert reopened.row(1, ["tags", "info", "name"]) == {"tags": [], "info": None, "name": "second"}
+
+    tags, ends = reopened.values("tags")
+    assert tags.tolist() == [4, 7, 9]
+    assert row_ids(ends).tolist() == [0, 0, 2]
+
+
+def test_uncommitted_bytes_are_ignored_and_truncated(tmp_path) -> None:
+    """Bytes from an interrupted append are invisible and overwritten by the next one."""
+    store = ColumnarStore(str(tmp_path), COLUMNS)
+    store.append([{"name": "kept", "tags": [1]}])
+    with open(tmp_path / "name.data", "ab") as f:
+        f.write(b"torn")
+    with open(tmp_path / "years.col", "ab") as f:
+        f.write(b"\x01\x00")
+
+    assert len(store) == 1
+    store.append([{"name": "next", "years": 3, "tags": [2]}])
+
+    assert store.get("name", 1) == "next"
+    assert store.column("years").tolist() == [0, 3]
+    assert store.values("tags")[0].tolist() == [1, 2]
+
+
+def test_threaded_appends_without_file_locks(tmp_path, monkeypatch) -> None:
+    """Where fcntl is missing, the store's thread lock still keeps appends whole."""
+    import columnar_store
+
+    monkeypatch.setattr(columnar_store, "_lock_file", lambda f: None)
+    monkeypatch.setattr(columnar_store, "_unlock_file", lambda f: None)
+    store = ColumnarStore(str(tmp_path), COLUMNS)
+
+    def worker(n: int) -> None:
+        for i in range(20):
+            store.append([{"years": n, "tags": [n] * (i % 3), "name": f"{n}-{i}"}])
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store) == 80
+    rows = [store.row(i, ["years", "tags", "name"]) for i in range(80)]
+    assert sorted(row["name"] for row in rows) == sorted(f"{n}-{i}" for n in range(4) for i in range(20))
+    assert all(row["name"].startswith(f"{row['years']}-") and set(row["tags"]) <= {row["years"]} for row in rows)
+
+
+def test_layout_mismatch_is_rejected(tmp_path) -> None:
+    ColumnarStore(str(tmp_path), COLUMNS)
+    with pytest.raises(ValueError):
+        ColumnarStore(str(tmp_path), COLUMNS[:2])
+
+
+def test_job_store_prepared_jobs(tmp_path) -> None:
+    """Stored jobs come back in the shape batch scoring expects."""
+    store = JobStore(str(tmp_path))
+    embedding = np.zeros(384, dtype=np.float32)
+    embedding[0] = 1.0
+    store.add("Python and Docker role", {"experience_level": "3"}, ["Python", "Docker"], url="https://x/1")
+    store.add("Figma designer", {}, ["Figma"], embedding=embedding)
+
+    jobs = store.prepared_jobs()
+
+    assert [job["description"] for job in jobs] == ["Python and Docker role", "Figma designer"]
+    assert jobs[0]["skills"] == ["Python", "Docker"] and jobs[0]["embedding"] is None
+    assert jobs[1]["embedding"][0] == 1.0
+    assert store.get(0)["requirements"] == {"experience_level": "3"}
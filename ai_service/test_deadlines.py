@@ -0,0 +1,215 @@
+"""
+Tests for deadline-aware degradation of /analyze, using injected slow stages.
+"""
+import asyncio
+import json
+import time
+import zlib
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import deadlines
+import main
+import skill_normalizer  # bind its model before the fixture swaps in SlowModel
+import utils
+from deadlines import DEGRADED, ArrivalTimeMiddleware, CostModel, request_deadline
+from skill_normalizer import SkillNormalizer, char_ngram_encode
+
+RESUME = "Experience\nPython developer building REST APIs with Docker and AWS for 5 years"
+JOB = "Looking for a Python engineer with Docker and AWS experience"
+
+
+class SlowModel:
+    """Stand-in sentence transformer whose encode takes a fixed time"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def encode(self, texts, normalize_embeddings=True, convert_to_numpy=True):
+        self.calls += 1
+        time.sleep(self.delay)
+        vectors = np.stack([
+            np.random.default_rng(zlib.crc32(text.encode())).standard_normal(16) for text in texts
+        ]).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def slow_stages(monkeypatch):
+    """Inject slow document and skill-phrase encoders and a slow TF-IDF fit; returns a setter for their delays"""
+    monkeypatch.setenv("FUZZY_SKILLS", "1")
+    # Faster learning than the service default, so one warm-up request is enough
+    monkeypatch.setattr(deadlines, "costs", CostModel(alpha=0.5))
+    monkeypatch.setattr(utils, "_embedding_cache", utils.OrderedDict())
+    model = SlowModel(0.0)
+    monkeypatch.setattr(utils, "model", model)
+
+    phrase_delay = {"value": 0.0}
+
+    def slow_phrase_encode(texts):
+        time.sleep(phrase_delay["value"] * len(texts))
+        return char_ngram_encode(texts)
+
+    normalizer = SkillNormalizer(encode=slow_phrase_encode, threshold=0.75, prefilter=True)
+    monkeypatch.setattr(skill_normalizer, "_normalizer", normalizer)
+
+    tfidf_delay = {"value": 0.0}
+    real_vectorizer = main.TfidfVectorizer
+
+    class SlowVectorizer(real_vectorizer):
+        def fit_transform(self, raw_documents, y=None):
+            time.sleep(tfidf_delay["value"])
+            return super().fit_transform(raw_documents, y)
+
+    monkeypatch.setattr(main, "TfidfVectorizer", SlowVectorizer)
+
+    def set_delays(encode: float = 0.0, tfidf: float = 0.0, phrases: float = 0.0) -> SlowModel:
+        model.delay = encode
+        tfidf_delay["value"] = tfidf
+        phrase_delay["value"] = phrases
+        return model
+
+    return set_delays
+
+
+def _analyze(client, deadline_ms=None):
+    headers = {"X-Deadline-Ms": str(deadline_ms)} if deadline_ms is not None else {}
+    return client.post("/analyze?view=scores", headers=headers,
+                       json={"resume_text": RESUME, "job_description": JOB, "resume_data": {}})
+
+
+def test_no_deadline_runs_every_stage(slow_stages) -> None:
+    model = slow_stages(encode=0.05)
+    body = _analyze(TestClient(main.app)).json()
+
+    assert "degraded" not in body
+    assert model.calls == 1
+
+
+def test_tight_deadline_degrades_semantic_similarity(slow_stages) -> None:
+    """Once the encoder is known to be slow, a short budget falls back to Jaccard."""
+    client = TestClient(main.app)
+    model = slow_stages(encode=0.3)
+    _analyze(client, deadline_ms=10_000)  # teaches the cost model the encoder's speed
+    before = DEGRADED.value(component="semantic_similarity", fallback="jaccard")
+
+    other_job = JOB + " and Kubernetes"
+    start = time.perf_counter()
+    response = client.post("/analyze?view=scores", headers={"X-Deadline-Ms": "100"},
+                           json={"resume_text": RESUME, "job_description": other_job, "resume_data": {}})
+    elapsed = time.perf_counter() - start
+
+    body = response.json()
+    assert body["degraded"]["semantic_similarity"] == "jaccard"
+    assert body["semantic_similarity"] == int(utils.jaccard_similarity(RESUME, other_job) * 100)
+    assert model.calls == 1
+    assert elapsed < 0.3
+    assert DEGRADED.value(component="semantic_similarity", fallback="jaccard") == before + 1
+
+
+def test_cached_embeddings_avoid_degradation(slow_stages) -> None:
+    """Texts already encoded are served from the cache even under a tight budget."""
+    client = TestClient(main.app)
+    model = slow_stages(encode=0.3)
+    full = _analyze(client, deadline_ms=10_000).json()
+
+    cached = _analyze(client, deadline_ms=100).json()
+
+    assert "degraded" not in cached
+    assert cached["semantic_similarity"] == full["semantic_similarity"]
+    assert model.calls == 1
+
+
+def test_slow_tfidf_degrades_experience_match(slow_stages) -> None:
+    client = TestClient(main.app)
+    slow_stages(tfidf=0.3)
+    _analyze(client, deadline_ms=10_000)
+
+    body = _analyze(client, deadline_ms=50).json()
+
+    assert body["degraded"]["experience_match"] == "term_frequency"
+    assert body["experience_match"] == int(main.term_frequency_similarity(RESUME, JOB) * 100)
+
+
+def test_deadline_from_config_and_stream(slow_stages, monkeypatch) -> None:
+    """ANALYZE_DEADLINE_MS applies without a header, and /analyze/stream reports degradation too."""
+    client = TestClient(main.app)
+    slow_stages(encode=0.3)
+    _analyze(client)
+    monkeypatch.setenv("ANALYZE_DEADLINE_MS", "50")
+
+    events = [line for line in client.post(
+        "/analyze/stream", json={"resume_text": RESUME + " Go", "job_description": JOB, "resume_data": {}}
+    ).iter_lines() if line]
+
+    scores, result = json.loads(events[1]), json.loads(events[2])
+    assert scores["data"]["degraded"]["semantic_similarity"] == "jaccard"
+    assert result["data"]["degraded"] == scores["data"]["degraded"]
+
+
+def test_slow_skill_phrase_encode_falls_back_to_exact_aliases(slow_stages) -> None:
+    """The fuzzy skill pass is skipped when encoding its n-grams would overrun the budget."""
+    client = TestClient(main.app)
+    slow_stages(phrases=0.05)
+    _analyze(client, deadline_ms=10_000)
+
+    resume = RESUME + ". Deployed on k8s and Elastic Search"
+    start = time.perf_counter()
+    body = client.post("/analyze", headers={"X-Deadline-Ms": "100"},
+                       json={"resume_text": resume, "job_description": JOB, "resume_data": {}}).json()
+    elapsed = time.perf_counter() - start
+
+    assert body["degraded"]["skills"] == "exact_aliases"
+    assert "Kubernetes" in body["your_skills"] and "Elasticsearch" not in body["your_skills"]
+    assert elapsed < 0.3
+
+
+@pytest.mark.parametrize("value", ["soon", "nan", "inf", "-5"])
+def test_invalid_deadline_header_is_rejected(value) -> None:
+    response = _analyze(TestClient(main.app), deadline_ms=value)
+    assert response.status_code == 400
+
+
+def test_cost_estimate_blends_and_decays_to_default() -> None:
+    """One slow sample moves the estimate part way, and an unobserved step drifts back to its default."""
+    now = {"value": 0.0}
+    model = CostModel({"encode": 0.05}, alpha=0.2, half_life_s=10.0, clock=lambda: now["value"])
+
+    model.observe("encode", 0.55)
+    assert model.estimate("encode") == pytest.approx(0.15)
+
+    now["value"] = 10.0
+    assert model.estimate("encode") == pytest.approx(0.10)
+    now["value"] = 1000.0
+    assert model.estimate("encode") == pytest.approx(0.05)
+
+    # A fresh sample blends with the decayed estimate, not the stale one
+    model.observe("encode", 0.05)
+    assert model.estimate("encode") == pytest.approx(0.05)
+
+
+def test_deadline_counts_time_before_the_handler() -> None:
+    """Time spent in middleware inside ArrivalTimeMiddleware (e.g. admission queueing) uses up the budget."""
+    app = FastAPI()
+
+    @app.get("/remaining")
+    async def remaining(request: Request):
+        return {"remaining": request_deadline(request).remaining()}
+
+    class Queue:
+        def __init__(self, inner):
+            self.inner = inner
+
+        async def __call__(self, scope, receive, send):
+            await asyncio.sleep(0.2)
+            await self.inner(scope, receive, send)
+
+    app.add_middleware(Queue)
+    app.add_middleware(ArrivalTimeMiddleware)
+
+    body = TestClient(app).get("/remaining", headers={"X-Deadline-Ms": "1000"}).json()
+    assert body["remaining"] <= 0.8
@@ -0,0 +1,81 @@
+"""
+Tests for the streaming DOCX extractor.
+"""
+import io
+import zipfile
+
+from docx import Document
+from docx.enum.text import WD_TAB_ALIGNMENT
+from docx.shared import Inches
+
+from docx_extractor import extract_docx_text, iter_docx_paragraphs
+from main import extract_text_from_docx
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MC_NS = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+
+
+def _docx_with_body(body: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", (
+            f'<w:document xmlns:w="{W_NS}" xmlns:mc="{MC_NS}"><w:body>{body}</w:body></w:document>'
+        ))
+    return buffer.getvalue()
+
+
+def test_matches_python_docx_paragraphs() -> None:
+    """Plain paragraphs come out exactly as the python-docx implementation produced them."""
+    doc = Document()
+    doc.add_paragraph("Jane Doe")
+    doc.add_paragraph("")
+    doc.add_paragraph("Python developer")
+    dated = doc.add_paragraph("Acme Corp\t2019-2023")
+    dated.paragraph_format.tab_stops.add_tab_stop(Inches(3))
+    dated.paragraph_format.tab_stops.add_tab_stop(Inches(6), WD_TAB_ALIGNMENT.RIGHT)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+
+    expected = "".join(p.text + "\n" for p in Document(io.BytesIO(buffer.getvalue())).paragraphs)
+    assert expected == "Jane Doe\n\nPython developer\nAcme Corp\t2019-2023\n"
+    assert extract_docx_text(buffer.getvalue()) == expected
+
+
+def test_tables_headers_and_footers_in_order() -> None:
+    """Header text comes first, then body paragraphs and table cells, then the footer."""
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "jane@example.com"
+    doc.sections[0].footer.paragraphs[0].text = "github.com/jane"
+    doc.add_paragraph("Summary")
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Skills"
+    table.cell(0, 1).text = "Python, React"
+    doc.add_paragraph("Experience")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+
+    lines = [line for line in iter_docx_paragraphs(buffer.getvalue()) if line]
+
+    assert lines == ["jane@example.com", "Summary", "Skills", "Python, React", "Experience", "github.com/jane"]
+
+
+def test_text_box_fallback_is_not_duplicated() -> None:
+    """Text boxes are read once even though Word stores a VML fallback copy."""
+    box = '<w:txbxContent><w:p><w:r><w:t>Sidebar</w:t></w:r></w:p></w:txbxContent>'
+    content = _docx_with_body(
+        '<w:p><w:r><w:t>Name</w:t><w:tab/><w:t>Title</w:t></w:r>'
+        f'<w:r><mc:AlternateContent><mc:Choice Requires="wps"><w:drawing>{box}</w:drawing></mc:Choice>'
+        f'<mc:Fallback><w:pict>{box}</w:pict></mc:Fallback></mc:AlternateContent></w:r></w:p>'
+    )
+
+    assert list(iter_docx_paragraphs(content)) == ["Sidebar", "Name\tTitle"]
+
+
+def test_falls_back_to_python_docx_on_invalid_archive() -> None:
+    """Content that is not a DOCX zip still goes through python-docx and its error."""
+    try:
+        extract_text_from_docx(b"not a zip file")
+    except Exception as e:
+        assert "Failed to extract text from DOCX" in str(e)
+    else:
+        raise AssertionError("expected an extraction error")
@@ -1,9 +1,12 @@
 """
 Test file for the AI service to demonstrate type checking and functionality.
 """
+import json
 import pytest
 from typing import List, Dict, Any
+from fastapi.testclient import TestClient
 from main import (
+    app,
     extract_skills,
     calculate_skill_match,
     calculate_experience_match,
@@ -21,9 +24,9 @@ def test_extract_skills() -> None:
     skills = extract_skills(text)
     
     assert isinstance(skills, list)
-    assert "python" in skills
-    assert "javascript" in skills
-    assert "react" in skills
+    assert "Python" in skills
+    assert "JavaScript" in skills
+    assert "React" in skills
 
 
 def test_calculate_skill_match() -> None:
@@ -112,6 +115,84 @@ def test_extract_education() -> None:
     assert len(education) > 0
 
 
+ANALYZE_PAYLOAD = {
+    "resume_text": "Skills\nPython, Docker, React\nExperience\n5 years experience building APIs",
+    "job_description": "Looking for a Python and Kubernetes engineer with 3+ years experience",
+    "resume_data": {}
+}
+
+
+def test_analyze_scores_view() -> None:
+    """The scores view returns only the numeric summary."""
+    client = TestClient(app)
+    response = client.post("/analyze?view=scores", json=ANALYZE_PAYLOAD)
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert "overall_score" in body
+    assert "resume_sections" not in body
+    assert "strengths" not in body
+
+
+def test_analyze_selected_fields() -> None:
+    """Explicit fields, including single resume sections, override the view."""
+    client = TestClient(app)
+    response = client.post(
+        "/analyze?view=scores&fields=overall_score,resume_sections.skills", json=ANALYZE_PAYLOAD
+    )
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"overall_score", "resume_sections"}
+    assert set(body["resume_sections"]) == {"skills"}
+
+
+def test_analyze_full_view_is_default() -> None:
+    """Without parameters the full payload is returned."""
+    client = TestClient(app)
+    body = client.post("/analyze", json=ANALYZE_PAYLOAD).json()
+    
+    assert "resume_sections" in body
+    assert "job_requirements" in body
+    assert "your_skills" in body
+
+
+def test_analyze_rejects_unknown_fields() -> None:
+    """Unknown views and fields are client errors."""
+    client = TestClient(app)
+    
+    assert client.post("/analyze?view=tiny", json=ANALYZE_PAYLOAD).status_code == 400
+    assert client.post("/analyze?fields=bogus", json=ANALYZE_PAYLOAD).status_code == 400
+
+
+def test_analyze_stream_ends_with_analyze_response() -> None:
+    """The NDJSON stream sends cheap scores first and ends with the /analyze payload."""
+    client = TestClient(app)
+    response = client.post("/analyze/stream", json=ANALYZE_PAYLOAD)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [e["event"] for e in events] == ["skills", "scores", "result"]
+    assert "Python" in events[0]["data"]["matching_skills"]
+    assert set(events[1]["data"]) == {"experience_match", "semantic_similarity"}
+    assert events[-1]["data"] == client.post("/analyze", json=ANALYZE_PAYLOAD).json()
+
+
+def test_analyze_stream_sse() -> None:
+    """Clients accepting text/event-stream get Server-Sent Events."""
+    client = TestClient(app)
+    response = client.post(
+        "/analyze/stream?view=scores", json=ANALYZE_PAYLOAD, headers={"Accept": "text/event-stream"}
+    )
+    
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [b for b in response.text.split("\n\n") if b]
+    assert [b.splitlines()[0] for b in blocks] == ["event: skills", "event: scores", "event: result"]
+    result = json.loads(blocks[-1].splitlines()[1][len("data: "):])
+    assert "resume_sections" not in result
+
+
 if __name__ == "__main__":
     # Run basic functionality tests
     print("Running type checking tests...")
@@ -0,0 +1,93 @@
+"""
+Tests for the opt-in request profiling middleware.
+"""
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import profiling
+from profiling import ProfileStore, ProfilingMiddleware, run_in_threadpool, thread_profiled
+
+
+def _busy(seconds: float) -> int:
+    end = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < end:
+        count += 1
+    return count
+
+
+def _client(sample_rate: float = 0.0) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        # CPU work in the threadpool, as the main.py handlers do it
+        return {"count": await run_in_threadpool(_busy, 0.05)}
+
+    @app.get("/sync-work")
+    @thread_profiled
+    def sync_work():
+        return {"count": _busy(0.05)}
+
+    app.add_middleware(ProfilingMiddleware, sample_rate=sample_rate, interval=0.001)
+    app.include_router(profiling.router)
+    return TestClient(app)
+
+
+def test_requests_without_header_are_not_profiled(monkeypatch) -> None:
+    """Profiling stays off unless asked for."""
+    monkeypatch.setattr(profiling, "store", ProfileStore())
+    client = _client()
+
+    response = client.get("/work")
+
+    assert "x-profile-id" not in response.headers
+    assert client.get("/debug/profiles").json() == {"profiles": []}
+
+
+def test_header_profiles_request_and_stores_result(monkeypatch) -> None:
+    """A profiled request is listed and exposes top functions and collapsed stacks."""
+    monkeypatch.setattr(profiling, "store", ProfileStore())
+    client = _client()
+
+    response = client.get("/work", headers={"X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+
+    listed = client.get("/debug/profiles").json()["profiles"]
+    assert [p["id"] for p in listed] == [profile_id]
+    assert listed[0]["path"] == "/work"
+    assert listed[0]["status"] == 200
+
+    profile = client.get(f"/debug/profiles/{profile_id}").json()
+    # Only the request's own work is profiled, not the event loop around it
+    assert profile["top_functions"][0]["function"] == "_busy"
+    collapsed = client.get(f"/debug/profiles/{profile_id}/collapsed").text
+    assert "_busy (test_profiling.py" in collapsed
+
+
+def test_sync_handlers_are_profiled_in_their_worker_thread(monkeypatch) -> None:
+    """Plain def handlers run in the threadpool and are profiled there."""
+    monkeypatch.setattr(profiling, "store", ProfileStore())
+    client = _client()
+
+    profile_id = client.get("/sync-work", headers={"X-Profile": "1"}).headers["x-profile-id"]
+
+    profile = client.get(f"/debug/profiles/{profile_id}").json()
+    assert any(row["function"] == "_busy" for row in profile["top_functions"])
+    assert "_busy (test_profiling.py" in profile["collapsed"]
+
+
+def test_store_is_bounded() -> None:
+    """The oldest profiles are evicted once the store is full."""
+    store = ProfileStore(max_profiles=2)
+    ids = [store.add({"path": f"/{i}"}) for i in range(3)]
+
+    assert store.get(ids[0]) is None
+    assert [p["id"] for p in store.list()] == [ids[2], ids[1]]
+
+
+def test_unknown_profile_is_404() -> None:
+    """Fetching a missing profile returns 404."""
+    assert _client().get("/debug/profiles/missing").status_code == 404
@@ -0,0 +1,108 @@
+"""
+Tests for the persisted resume store and the /rank-resumes endpoint.
+"""
+import numpy as np
+from fastapi.testclient import TestClient
+
+import resume_store
+from resume_store import ResumeStore
+
+
+def _unit(values) -> np.ndarray:
+    vector = np.zeros(384, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+
+def test_skill_overlap_ranking(tmp_path) -> None:
+    """Resumes covering more of the job's skills rank higher."""
+    store = ResumeStore(str(tmp_path))
+    store.add("python only", {}, ["Python"], filename="a.pdf")
+    store.add("full match", {}, ["Python", "Docker", "AWS"], filename="b.pdf")
+    store.add("unrelated", {}, ["Figma"], filename="c.pdf")
+
+    hits = store.top_k(["Python", "Docker", "AWS"], k=2)
+
+    assert [hit["resume_id"] for hit in hits] == [1, 0]
+    assert hits[0]["skill_match"] == 1.0
+    assert abs(hits[1]["skill_match"] - 1 / 3) < 1e-9
+    assert store.get(1, ["filename", "skill_ids"]) == {"id": 1, "filename": "b.pdf", "skills": ["Python", "Docker", "AWS"]}
+
+
+def test_semantic_similarity_breaks_ties(tmp_path) -> None:
+    """With equal skill overlap the closer embedding wins."""
+    store = ResumeStore(str(tmp_path))
+    store.add("far", {}, ["Python"], embedding=_unit([0.0, 1.0]))
+    store.add("near", {}, ["Python"], embedding=_unit([1.0, 0.1]))
+
+    hits = store.top_k(["Python"], _unit([1.0, 0.0]), k=2)
+
+    assert hits[0]["resume_id"] == 1
+    assert hits[0]["semantic_similarity"] > hits[1]["semantic_similarity"]
+
+    # Opposite vectors keep their raw negative cosine, as in /analyze
+    opposite = store.top_k(["Python"], _unit([-1.0, 0.0]), k=2)
+    assert opposite[-1]["semantic_similarity"] < 0
+
+
+def test_store_persists_across_reopen(tmp_path) -> None:
+    """Records and scoring arrays are reloaded from disk."""
+    store = ResumeStore(str(tmp_path))
+    store.add("first", {"skills": "Python"}, ["Python"], filename="first.docx")
+    store.add("second", {}, ["React"], filename="second.docx")
+
+    reopened = ResumeStore(str(tmp_path))
+
+    assert len(reopened) == 2
+    assert reopened.get(0)["sections"] == {"skills": "Python"}
+    assert reopened.top_k(["React"], k=1)[0]["resume_id"] == 1
+
+
+def test_rank_resumes_endpoint(tmp_path, monkeypatch) -> None:
+    """The endpoint returns stored candidates with skill breakdowns."""
+    monkeypatch.setenv("RESUME_STORE_DIR", str(tmp_path))
+    store = resume_store.get_resume_store()
+    store.add("Python and Docker engineer", {}, ["Python", "Docker"], filename="dev.pdf")
+
+    from main import app
+
+    client = TestClient(app)
+    response = client.post("/rank-resumes", json={
+        "job_description": "We need Python and Kubernetes experience",
+        "top_k": 5,
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_resumes"] == 1
+    candidate = body["candidates"][0]
+    assert candidate["filename"] == "dev.pdf"
+    assert candidate["matching_skills"] == ["Python"]
+    assert candidate["missing_skills"] == ["Kubernetes"]
+
+
+def test_instances_sharing_a_directory_see_each_other(tmp_path) -> None:
+    """Stores opened by different workers allocate distinct ids and see new rows."""
+    first = ResumeStore(str(tmp_path))
+    second = ResumeStore(str(tmp_path))
+
+    assert first.add("a", {}, ["Python"]) == 0
+    assert second.add("b", {}, ["React"]) == 1
+
+    assert len(first) == 2
+    assert first.get(1)["text"] == "b"
+    assert first.top_k(["React"], k=1)[0]["resume_id"] == 1
+
+
+def test_parsed_fields_are_stored(tmp_path) -> None:
+    """Experience years and education are kept alongside the text and skills."""
+    store = ResumeStore(str(tmp_path))
+    store.add("text", {"skills": "Go"}, ["Go", "Unknown"], filename="cv.pdf",
+              experience_years=7, education=["BSc Computer Science"])
+
+    record = store.get(0)
+
+    assert record["skills"] == ["Go"]
+    assert record["experience_years"] == 7
+    assert record["education"] == ["BSc Computer Science"]
+    assert store.table.column("experience_years").tolist() == [7]
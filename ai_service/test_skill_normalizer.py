@@ -0,0 +1,106 @@
+"""
+Tests for embedding-based skill normalization.
+"""
+import pytest
+
+from skill_normalizer import MAX_ENCODED_CANDIDATES, SkillNormalizer, candidate_ngrams, char_ngram_encode
+from utils import extract_skills, model
+
+GENERIC_WORDS = ["experience", "management", "design", "senior engineer", "team"]
+
+# (phrase as written in a resume, canonical skill)
+ALIAS_FIXTURES = [
+    ("ReactJS", "React"),
+    ("react.js", "React"),
+    ("k8s", "Kubernetes"),
+    ("postgres", "PostgreSQL"),
+    ("golang", "Go"),
+    ("sklearn", "Scikit-learn"),
+    ("NodeJS", "Node.js"),
+    ("MS Teams", "Microsoft Teams"),
+    ("Elastic Search", "Elasticsearch"),
+    ("micro services", "Microservices"),
+    ("REST APIs", "REST API"),
+]
+
+
+@pytest.fixture(scope="module")
+def normalizer() -> SkillNormalizer:
+    return SkillNormalizer(encode=char_ngram_encode, threshold=0.75)
+
+
+@pytest.mark.parametrize("phrase,skill", ALIAS_FIXTURES)
+def test_aliases_map_to_canonical_skills(normalizer, phrase, skill) -> None:
+    assert normalizer.normalize(phrase) == skill
+
+
+@pytest.mark.parametrize("phrase", GENERIC_WORDS)
+def test_generic_words_are_not_skills(normalizer, phrase) -> None:
+    assert normalizer.normalize(phrase) is None
+
+
+@pytest.fixture(scope="module")
+def transformer_normalizer() -> SkillNormalizer:
+    if model is None:
+        pytest.skip("sentence transformer model is not available")
+    return SkillNormalizer()
+
+
+def test_transformer_production_settings(transformer_normalizer) -> None:
+    """The fixtures hold with the sentence transformer at its default threshold, via extract's prefilter."""
+    for phrase, skill in ALIAS_FIXTURES:
+        assert transformer_normalizer.extract(phrase) == [skill], phrase
+    for phrase in GENERIC_WORDS:
+        assert transformer_normalizer.extract(phrase) == [], phrase
+
+
+def test_extract_finds_variants_in_text(normalizer) -> None:
+    """Skills named by aliases anywhere in the text are returned once, in order."""
+    text = "Shipped ReactJS apps on k8s backed by postgres. More ReactJS work."
+    assert normalizer.extract(text) == ["React", "Kubernetes", "PostgreSQL"]
+
+
+def test_candidate_embeddings_are_cached() -> None:
+    """Only n-grams not seen before are sent to the encoder, in one batch per call."""
+    calls = []
+
+    def counting_encode(texts):
+        calls.append(list(texts))
+        return char_ngram_encode(texts)
+
+    normalizer = SkillNormalizer(encode=counting_encode, threshold=0.75, prefilter=False)
+    calls.clear()
+    normalizer.extract("Deployed with k8s")
+    normalizer.extract("Deployed with k8s and postgres")
+
+    # Exact alias spellings ("k8s", "postgres") are never encoded
+    assert len(calls) == 2
+    assert set(calls[0]) == set(candidate_ngrams("Deployed with k8s")) - {"k8s"}
+    assert set(calls[1]) == {"k8s and postgres"}
+
+
+def test_prefilter_caps_encoded_candidates() -> None:
+    """With an expensive encoder, only a capped shortlist of n-grams is encoded."""
+    calls = []
+
+    def counting_encode(texts):
+        calls.append(list(texts))
+        return char_ngram_encode(texts)
+
+    normalizer = SkillNormalizer(encode=counting_encode, threshold=0.75)
+    calls.clear()
+    filler = " ".join(f"delivered project number {i} for the client" for i in range(200))
+    skills = normalizer.extract(f"{filler} using Elastic Search and k8s")
+
+    assert len(candidate_ngrams(filler)) > MAX_ENCODED_CANDIDATES
+    assert len(calls) == 1 and len(calls[0]) <= MAX_ENCODED_CANDIDATES
+    assert skills == ["Elasticsearch", "Kubernetes"]
+
+
+def test_extract_skills_includes_aliases(monkeypatch) -> None:
+    monkeypatch.setenv("FUZZY_SKILLS", "1")
+    skills = extract_skills("Built ReactJS frontends, ran services on k8s with postgres")
+    assert {"React", "Kubernetes", "PostgreSQL"} <= set(skills)
+
+    monkeypatch.delenv("FUZZY_SKILLS")
+    assert extract_skills("Built ReactJS frontends, ran services on k8s with postgres") == []
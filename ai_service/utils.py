@@ -1,9 +1,16 @@
 import re
-from typing import List, Dict, Any
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import numpy as np
 from sentence_transformers import SentenceTransformer
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
+from deadlines import Deadline, allows, observe
 
 # Download required NLTK data
 try:
@@ -21,7 +28,108 @@ try:
 except:
     model = None
 
-def extract_skills(text: str) -> List[str]:
+# LRU cache of text embeddings, keyed by a hash of the text
+EMBEDDING_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "1024"))
+_embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """Encode texts into L2-normalized float32 embeddings with the shared model"""
+    if model is None:
+        raise RuntimeError("Sentence transformer model is not available")
+    embeddings = model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+    return np.asarray(embeddings, dtype=np.float32)
+
+# A comprehensive set of skills from various fields
+SKILLS_DB = [
+    # Programming Languages
+    "JavaScript", "Python", "Java", "C++", "C#", "PHP", "Ruby", "Go", "Rust", "Swift", "Kotlin", "TypeScript",
+    "Scala", "Perl", "R", "MATLAB", "Assembly", "COBOL", "Fortran", "Lisp", "Prolog", "Haskell",
+    
+    # Web Technologies
+    "HTML", "CSS", "React", "Angular", "Vue.js", "Node.js", "Express", "Django", "Flask", "ASP.NET",
+    "Ruby on Rails", "Laravel", "Spring Boot", "JSP", "Servlet", "JSTL", "Thymeleaf", "Handlebars",
+    "EJS", "Pug", "SASS", "LESS", "Stylus", "Bootstrap", "Tailwind CSS", "Material-UI", "Ant Design",
+    
+    # Databases
+    "SQL", "MySQL", "PostgreSQL", "Oracle", "SQL Server", "SQLite", "MongoDB", "Redis", "Cassandra",
+    "DynamoDB", "Firebase", "Supabase", "CouchDB", "Neo4j", "InfluxDB", "Elasticsearch",
+    
+    # Cloud & DevOps
+    "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "Jenkins", "GitLab CI", "GitHub Actions",
+    "Terraform", "Ansible", "Chef", "Puppet", "Vagrant",
+    
+    # Mobile Development
+    "React Native", "Flutter", "Xamarin", "Ionic", "Cordova", "PhoneGap", "iOS", "Android",
+    "Swift", "Kotlin", "Objective-C", "Java", "Xcode", "Android Studio",
+    
+    # Data Science & ML
+    "Machine Learning", "Deep Learning", "TensorFlow", "PyTorch", "Scikit-learn", "Keras", "Pandas",
+    "NumPy", "Matplotlib", "Seaborn", "Plotly", "Jupyter", "R", "SAS", "SPSS", "Tableau", "Power BI",
+    
+    # Design & UX
+    "Figma", "Adobe XD", "Sketch", "InVision", "Framer", "Adobe Photoshop", "Adobe Illustrator",
+    "Adobe InDesign", "UI/UX", "User Research", "Wireframing", "Prototyping", "Design Systems",
+    
+    # Testing
+    "Jest", "Mocha", "Chai", "Cypress", "Selenium", "Playwright", "Puppeteer", "JUnit", "TestNG",
+    "PyTest", "Unit Testing", "Integration Testing", "E2E Testing", "TDD", "BDD",
+    
+    # Version Control
+    "Git", "GitHub", "GitLab", "Bitbucket", "SVN", "Mercurial",
+    
+    # Project Management
+    "Agile", "Scrum", "Kanban", "Jira", "Confluence", "Trello", "Asana", "Monday.com", "Notion",
+    
+    # Communication & Collaboration
+    "Slack", "Microsoft Teams", "Discord", "Zoom", "Google Meet", "Webex", "Skype",
+    
+    # Documentation
+    "Swagger", "OpenAPI", "Postman", "Insomnia", "API Documentation", "Technical Writing",
+    
+    # Security
+    "OAuth", "JWT", "SSL/TLS", "HTTPS", "Penetration Testing", "Security Auditing", "OWASP",
+    
+    # Performance & Monitoring
+    "New Relic", "Datadog", "Sentry", "LogRocket", "Google Analytics", "Mixpanel", "Amplitude",
+    
+    # Business Skills
+    "Project Management", "Product Management", "Business Analysis", "Requirements Gathering",
+    "Stakeholder Management", "Risk Management", "Budget Management", "Team Leadership",
+    
+    # Soft Skills
+    "Communication", "Teamwork", "Problem Solving", "Critical Thinking", "Time Management",
+    "Leadership", "Adaptability", "Creativity", "Emotional Intelligence", "Conflict Resolution",
+    
+    # Industry Knowledge
+    "E-commerce", "FinTech", "HealthTech", "EdTech", "SaaS", "B2B", "B2C", "Marketplace",
+    "Social Media", "Content Management", "CRM", "ERP", "HRIS", "Accounting Software",
+    
+    # Methodologies
+    "REST API", "GraphQL", "Microservices", "Serverless", "Event-Driven Architecture",
+    "Domain-Driven Design", "Clean Architecture", "SOLID Principles", "Design Patterns",
+    
+    # Tools & Platforms
+    "VS Code", "IntelliJ IDEA", "Eclipse", "Sublime Text", "Atom", "Vim", "Emacs",
+    "Postman", "Insomnia", "Swagger", "Figma", "Slack", "Trello", "Jira", "Confluence"
+]
+
+# Unique skill names in a stable order, used for skill IDs and bitsets
+SKILL_VOCABULARY = list(dict.fromkeys(SKILLS_DB))
+SKILL_INDEX = {skill: i for i, skill in enumerate(SKILL_VOCABULARY)}
+
+# skill_normalizer imports its vocabulary and encoder from this module, so it
+# is imported on first use and kept here rather than at the top of the file.
+_skill_normalizer_module = None
+
+def _skill_normalizer():
+    global _skill_normalizer_module
+    if _skill_normalizer_module is None:
+        import skill_normalizer
+        _skill_normalizer_module = skill_normalizer
+    return _skill_normalizer_module
+
+def extract_skills(text: str, deadline: Optional[Deadline] = None) -> List[str]:
     """Extract skills from text using a comprehensive skill database"""
     if not text or not text.strip():
         return []
@@ -29,84 +137,11 @@ def extract_skills(text: str) -> List[str]:
     # Convert to lowercase for matching
     text_lower = text.lower()
     
-    # A comprehensive set of skills from various fields
-    skills_db = [
-        # Programming Languages
-        "JavaScript", "Python", "Java", "C++", "C#", "PHP", "Ruby", "Go", "Rust", "Swift", "Kotlin", "TypeScript",
-        "Scala", "Perl", "R", "MATLAB", "Assembly", "COBOL", "Fortran", "Lisp", "Prolog", "Haskell",
-        
-        # Web Technologies
-        "HTML", "CSS", "React", "Angular", "Vue.js", "Node.js", "Express", "Django", "Flask", "ASP.NET",
-        "Ruby on Rails", "Laravel", "Spring Boot", "JSP", "Servlet", "JSTL", "Thymeleaf", "Handlebars",
-        "EJS", "Pug", "SASS", "LESS", "Stylus", "Bootstrap", "Tailwind CSS", "Material-UI", "Ant Design",
-        
-        # Databases
-        "SQL", "MySQL", "PostgreSQL", "Oracle", "SQL Server", "SQLite", "MongoDB", "Redis", "Cassandra",
-        "DynamoDB", "Firebase", "Supabase", "CouchDB", "Neo4j", "InfluxDB", "Elasticsearch",
-        
-        # Cloud & DevOps
-        "AWS", "Azure", "Google Cloud", "Docker", "Kubernetes", "Jenkins", "GitLab CI", "GitHub Actions",
-        "Terraform", "Ansible", "Chef", "Puppet", "Vagrant",
-        
-        # Mobile Development
-        "React Native", "Flutter", "Xamarin", "Ionic", "Cordova", "PhoneGap", "iOS", "Android",
-        "Swift", "Kotlin", "Objective-C", "Java", "Xcode", "Android Studio",
-        
-        # Data Science & ML
-        "Machine Learning", "Deep Learning", "TensorFlow", "PyTorch", "Scikit-learn", "Keras", "Pandas",
-        "NumPy", "Matplotlib", "Seaborn", "Plotly", "Jupyter", "R", "SAS", "SPSS", "Tableau", "Power BI",
-        
-        # Design & UX
-        "Figma", "Adobe XD", "Sketch", "InVision", "Framer", "Adobe Photoshop", "Adobe Illustrator",
-        "Adobe InDesign", "UI/UX", "User Research", "Wireframing", "Prototyping", "Design Systems",
-        
-        # Testing
-        "Jest", "Mocha", "Chai", "Cypress", "Selenium", "Playwright", "Puppeteer", "JUnit", "TestNG",
-        "PyTest", "Unit Testing", "Integration Testing", "E2E Testing", "TDD", "BDD",
-        
-        # Version Control
-        "Git", "GitHub", "GitLab", "Bitbucket", "SVN", "Mercurial",
-        
-        # Project Management
-        "Agile", "Scrum", "Kanban", "Jira", "Confluence", "Trello", "Asana", "Monday.com", "Notion",
-        
-        # Communication & Collaboration
-        "Slack", "Microsoft Teams", "Discord", "Zoom", "Google Meet", "Webex", "Skype",
-        
-        # Documentation
-        "Swagger", "OpenAPI", "Postman", "Insomnia", "API Documentation", "Technical Writing",
-        
-        # Security
-        "OAuth", "JWT", "SSL/TLS", "HTTPS", "Penetration Testing", "Security Auditing", "OWASP",
-        
-        # Performance & Monitoring
-        "New Relic", "Datadog", "Sentry", "LogRocket", "Google Analytics", "Mixpanel", "Amplitude",
-        
-        # Business Skills
-        "Project Management", "Product Management", "Business Analysis", "Requirements Gathering",
-        "Stakeholder Management", "Risk Management", "Budget Management", "Team Leadership",
-        
-        # Soft Skills
-        "Communication", "Teamwork", "Problem Solving", "Critical Thinking", "Time Management",
-        "Leadership", "Adaptability", "Creativity", "Emotional Intelligence", "Conflict Resolution",
-        
-        # Industry Knowledge
-        "E-commerce", "FinTech", "HealthTech", "EdTech", "SaaS", "B2B", "B2C", "Marketplace",
-        "Social Media", "Content Management", "CRM", "ERP", "HRIS", "Accounting Software",
-        
-        # Methodologies
-        "REST API", "GraphQL", "Microservices", "Serverless", "Event-Driven Architecture",
-        "Domain-Driven Design", "Clean Architecture", "SOLID Principles", "Design Patterns",
-        
-        # Tools & Platforms
-        "VS Code", "IntelliJ IDEA", "Eclipse", "Sublime Text", "Atom", "Vim", "Emacs",
-        "Postman", "Insomnia", "Swagger", "Figma", "Slack", "Trello", "Jira", "Confluence"
-    ]
     
     found_skills = []
     
     # Improved skill matching algorithm with better precision
-    for skill in skills_db:
+    for skill in SKILLS_DB:
         skill_lower = skill.lower()
         
         # Method 1: Check for word boundaries (most precise)
@@ -138,7 +173,14 @@ def extract_skills(text: str) -> List[str]:
     for skill in found_skills:
         if skill not in unique_skills:
             unique_skills.append(skill)
-    
+
+    # Add aliases and spelling variants ("ReactJS", "k8s") via the skill normalizer
+    normalizer = _skill_normalizer()
+    if normalizer.fuzzy_skills_enabled():
+        for skill in normalizer.get_skill_normalizer().extract(text, deadline):
+            if skill not in unique_skills:
+                unique_skills.append(skill)
+
     # Debug logging
     print(f"Text length: {len(text)}")
     print(f"Text preview: {text[:200]}...")
@@ -155,7 +197,6 @@ def extract_skills(text: str) -> List[str]:
             elif skill_lower in text_lower:
                 print(f"   ⚠️  {skill} found as substring - this might be a false positive")
                 # Show the context around the match
-                import re
                 matches = re.finditer(re.escape(skill_lower), text_lower)
                 for match in matches:
                     start = max(0, match.start() - 20)
@@ -167,30 +208,57 @@ def extract_skills(text: str) -> List[str]:
     
     return unique_skills
 
-def calculate_semantic_similarity(text1: str, text2: str) -> float:
-    """Calculate semantic similarity between two texts using sentence transformers"""
+def jaccard_similarity(text1: str, text2: str) -> float:
+    """Word-set overlap, the cheap fallback for semantic similarity"""
+    words1 = set(text1.lower().split())
+    words2 = set(text2.lower().split())
+    intersection = words1.intersection(words2)
+    union = words1.union(words2)
+    return len(intersection) / len(union) if union else 0
+
+def cached_embeddings(texts: List[str], deadline: Optional[Deadline] = None) -> Optional[np.ndarray]:
+    """Normalized embeddings of texts, encoding only those not cached.
+
+    Returns None when the texts still to encode would not fit in the deadline.
+    """
+    keys = [hashlib.sha1(text.encode("utf-8")).digest() for text in texts]
+    with _embedding_cache_lock:
+        found = {key: _embedding_cache[key] for key in keys if key in _embedding_cache}
+        for key in found:
+            _embedding_cache.move_to_end(key)
+    missing = [(key, text) for key, text in dict(zip(keys, texts)).items() if key not in found]
+    if missing:
+        if not allows(deadline, "encode", len(missing)):
+            return None
+        start = time.perf_counter()
+        encoded = encode_texts([text for _, text in missing])
+        observe("encode", start, len(missing))
+        with _embedding_cache_lock:
+            for (key, _), embedding in zip(missing, encoded):
+                found[key] = _embedding_cache[key] = embedding
+            while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+    return np.stack([found[key] for key in keys])
+
+def calculate_semantic_similarity(text1: str, text2: str, deadline: Optional[Deadline] = None) -> float:
+    """Calculate semantic similarity between two texts using sentence transformers.
+
+    Embeddings are cached; when encoding the uncached text(s) would overrun
+    the deadline, the Jaccard fallback is used and recorded on the deadline.
+    """
     if model is None:
         # Fallback to simple text similarity if model is not available
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        return len(intersection) / len(union) if union else 0
+        return jaccard_similarity(text1, text2)
     
     try:
-        # Encode texts to embeddings
-        embeddings1 = model.encode([text1])
-        embeddings2 = model.encode([text2])
+        embeddings = cached_embeddings([text1, text2], deadline)
+        if embeddings is None:
+            deadline.degrade("semantic_similarity", "jaccard")
+            return jaccard_similarity(text1, text2)
         
-        # Calculate cosine similarity
-        from sklearn.metrics.pairwise import cosine_similarity
-        similarity = cosine_similarity(embeddings1, embeddings2)[0][0]
-        return float(similarity)
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        return float(np.dot(embeddings[0], embeddings[1]))
     except Exception as e:
         print(f"Error calculating semantic similarity: {e}")
         # Fallback to simple text similarity
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        return len(intersection) / len(union) if union else 0
\ No newline at end of file
+        return jaccard_similarity(text1, text2)
\ No newline at end of file